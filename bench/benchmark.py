@@ -0,0 +1,435 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    benchmark.py                                       :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 09:12:31 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 09:12:33 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""Benchmarks of the hot paths of ex0, ex1 and ex2.
+
+Usage:
+    python bench/benchmark.py [--size N] [--mix KIND=WEIGHT,...]
+                              [--only NAME,...] [--repeat N] [--save FILE]
+                              [--compare FILE] [--threshold RATIO]
+
+Every case is fed with synthetic records, its console output is
+discarded, and it reports records/second, latency percentiles per call
+and the peak memory traced while it runs. Every case is timed --repeat
+times, its passes interleaved with the other cases, and the best pass is
+kept for each figure, so that a comparison reflects the code rather than
+the noise of the machine. --only picks the cases whose name contains one
+of the given substrings, whatever their case. --save writes the results
+to a JSON baseline, --compare checks them against one and exits with 1
+when a case got slower, or heavier, by more than the threshold.
+
+It also reports the memory footprint of one buffered sensor reading,
+stored as a tuple of three floats in a list, like SensorStream received
+them, and in the columns of SensorReadings. On CPython 3.11 a tuple
+reading costs about 144 bytes (64 for the tuple, 3 * 24 for the floats
+and 8 for the list slot) when a columnar one costs 24 bytes (3 * 8).
+"""
+
+from contextlib import redirect_stdout
+from typing import Any, Callable, Iterator
+import argparse
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("ex0", "ex1", "ex2"):
+    sys.path.insert(0, os.path.join(ROOT, folder))
+
+import stream_processor  # noqa: E402
+import data_stream  # noqa: E402
+import nexus_pipeline  # noqa: E402
+
+# A throughput pass lasts at least this long, in seconds
+MIN_PASS = 0.01
+# Latencies below this, in ms, are mostly the cost of reading the clock
+MIN_LATENCY_MS = 0.005
+DEFAULT_MIX = {
+    "numeric": 1, "text": 1, "log": 1,
+    "sensor": 1, "transaction": 1, "event": 1,
+    "json": 1, "csv": 1, "tuple": 1
+}
+WORDS = ["nexus", "stream", "data", "pipeline", "sensor", "quantum",
+         "matrix", "signal"]
+EVENTS = ["login", "logout", "error"]
+LEVELS = ["ERROR", "INFO", "WARNING", "DEBUG"]
+
+
+class NullWriter(io.TextIOBase):
+    """Swallow the prints of the processors during a measure"""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+
+def pick(rng: random.Random, mix: dict[str, float],
+         kinds: list[str]) -> str:
+    weights = [mix.get(kind, 0) for kind in kinds]
+    if sum(weights) <= 0:
+        weights = [1] * len(kinds)
+    return rng.choices(kinds, weights)[0]
+
+
+def gen_processor_data(rng: random.Random, kind: str) -> Any:
+    if kind == "numeric":
+        values = [rng.randint(-1000, 1000) for _ in range(rng.randint(1, 8))]
+        return values if rng.random() < 0.5 else dict(enumerate(values))
+    if kind == "text":
+        return " ".join(rng.choices(WORDS, k=rng.randint(1, 12)))
+    return f"{rng.choice(LEVELS)}: {' '.join(rng.choices(WORDS, k=4))}"
+
+
+def gen_stream_item(rng: random.Random, kind: str) -> Any:
+    if kind == "sensor":
+        return (round(rng.uniform(10, 40), 1), round(rng.uniform(20, 90), 1),
+                round(rng.uniform(30, 80), 1))
+    if kind == "transaction":
+        return [rng.choice([-1, 1]) * rng.randint(1, 3000)
+                for _ in range(rng.randint(1, 6))]
+    return rng.choices(EVENTS, k=rng.randint(1, 6))
+
+
+def gen_nexus_record(rng: random.Random, kind: str) -> Any:
+    temp = round(rng.uniform(15, 35), 1)
+    if kind == "json":
+        return json.dumps({"sensor": "temp", "value": temp, "unit": "C"})
+    severity = "Normal" if 20 < temp < 30 else "Critical"
+    if kind == "csv":
+        return f"{temp}, {severity}, C"
+    return (f"{temp}°C", severity)
+
+
+def case_processors(rng: random.Random, size: int,
+                    mix: dict[str, float]) -> dict[str, tuple]:
+    """One case per processor of ex0, each receiving its own kind"""
+    procs = {
+        "numeric": stream_processor.NumericProcessor(),
+        "text": stream_processor.TextProcessor(),
+        "log": stream_processor.LogProcessor()
+    }
+    cases = {}
+    for kind, proc in procs.items():
+        count = max(1, int(size * mix.get(kind, 0)
+                           / max(sum(mix.get(k, 0) for k in procs), 1e-9)))
+        inputs = [gen_processor_data(rng, kind) for _ in range(count)]
+        cases[f"ex0.{type(proc).__name__}.process"] =\
+            (proc.process, inputs, 1)
+    return cases
+
+
+def case_streams(rng: random.Random, size: int,
+                 mix: dict[str, float], batch: int) -> dict[str, tuple]:
+    """Batches of mixed stream items sent to StreamProcessor"""
+    kinds = ["sensor", "transaction", "event"]
+    items = [gen_stream_item(rng, pick(rng, mix, kinds))
+             for _ in range(size)]
+    # The stats of SensorStream need at least one reading per batch
+    batches = [[gen_stream_item(rng, "sensor")] + items[i:i + batch]
+               for i in range(0, len(items), batch)]
+    processor = data_stream.StreamProcessor()
+
+    def dispatch(datas: list) -> None:
+        processor.dispatch_sensors(datas, None, None, None)
+
+    def dispatch_wire(payload: bytes) -> None:
+        processor.dispatch_wire(payload, None, None, None)
+    frames = [data_stream.encode_batch(datas) for datas in batches]
+    return {
+        "ex1.StreamProcessor.dispatch_sensors": (dispatch, batches,
+                                                 batch + 1),
+        "ex1.StreamProcessor.dispatch_wire": (dispatch_wire, frames,
+                                              batch + 1)
+    }
+
+
+def case_nexus(rng: random.Random, size: int,
+               mix: dict[str, float]) -> dict[str, tuple]:
+    """Records of every format sent through the chained adapters"""
+    kinds = ["json", "csv", "tuple"]
+    records = [gen_nexus_record(rng, pick(rng, mix, kinds))
+               for _ in range(size)]
+    with redirect_stdout(NullWriter()):
+        manager = nexus_pipeline.NexusManager()
+    return {"ex2.NexusManager.process_data": (manager.process_data,
+                                              records, 1)}
+
+
+def case_fusion(rng: random.Random, size: int,
+                mix: dict[str, float]) -> dict[str, tuple]:
+    """The same stages run by the generic loop and by the fused callable"""
+    kinds = ["json", "csv", "tuple"]
+    records = [gen_nexus_record(rng, pick(rng, mix, kinds))
+               for _ in range(size)]
+    pipeline = nexus_pipeline.JSONAdapter("BENCH_001")
+
+    def unfused(data: Any) -> None:
+        try:
+            nexus_pipeline.ProcessingPipeline.process(pipeline, data)
+        except nexus_pipeline.DataError:
+            pass
+
+    run = pipeline.fuse()
+
+    def fused(data: Any) -> None:
+        try:
+            run(data)
+        except nexus_pipeline.DataError:
+            pass
+    return {
+        "ex2.ProcessingPipeline.process": (unfused, records, 1),
+        "ex2.ProcessingPipeline.fuse": (fused, records, 1)
+    }
+
+
+def footprint(rng: random.Random, size: int) -> dict[str, float]:
+    """Bytes used by one sensor reading kept in a buffer, as tuples and
+    as columns.
+    """
+    raw = [gen_stream_item(rng, "sensor") for _ in range(size)]
+    tracemalloc.start()
+    try:
+        # Rebuild the floats so they are traced with the tuples
+        before = tracemalloc.get_traced_memory()[0]
+        tuples = [(t + 0.0, h + 0.0, p + 0.0) for t, h, p in raw]
+        as_tuples = tracemalloc.get_traced_memory()[0] - before
+        before = tracemalloc.get_traced_memory()[0]
+        columns = data_stream.SensorReadings.build(tuples)
+        as_columns = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del tuples, columns
+    return {
+        "tuple_bytes_per_reading": round(as_tuples / size, 1),
+        "column_bytes_per_reading": round(as_columns / size, 1)
+    }
+
+
+def percentile(sorted_values: list[float], ratio: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1,
+                int(round(ratio * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(func: Callable[[Any], Any], inputs: list,
+            records_per_call: int, trace: bool = True) -> dict[str, float]:
+    """Time one pass over the inputs, then replay them under tracemalloc.
+
+    The throughput is timed by running the inputs in a loop for at least
+    MIN_PASS seconds, the latencies by timing every call once. The garbage
+    collector is off while timing, like in timeit.
+
+    Args:
+        func (Callable[[Any], Any]): The hot path to measure
+        inputs (list): One argument per call
+        records_per_call (int): How many records a call handles
+        trace (bool): Also measure the peak memory
+
+    Returns:
+        dict[str, float]: Throughput, latencies in ms and peak in KiB
+    """
+    clock = time.perf_counter
+    latencies: list[float] = []
+    peak = 0
+    with redirect_stdout(NullWriter()):
+        for data in inputs[:10]:
+            func(data)
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for data in inputs:
+                call_start = clock()
+                func(data)
+                latencies.append(clock() - call_start)
+            loops = max(1, math.ceil(MIN_PASS / max(sum(latencies), 1e-9)))
+            start = clock()
+            for _ in range(loops):
+                for data in inputs:
+                    func(data)
+            per_loop = (clock() - start) / loops
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if trace:
+            tracemalloc.start()
+            try:
+                for data in inputs:
+                    func(data)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+    latencies.sort()
+    records = len(inputs) * records_per_call
+    return {
+        "records": records,
+        "records_per_sec": round(records / per_loop, 1) if per_loop else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+
+def keep_best(best: dict[str, float] | None,
+              res: dict[str, float]) -> dict[str, float]:
+    """Merge two passes of a case, keeping the best value of each figure"""
+    if best is None:
+        return res
+    merged = dict(best)
+    merged["records_per_sec"] = max(best["records_per_sec"],
+                                    res["records_per_sec"])
+    for figure in ("p50_ms", "p95_ms", "p99_ms"):
+        merged[figure] = min(best[figure], res[figure])
+    return merged
+
+
+def build_cases(size: int, mix: dict[str, float], batch: int,
+                seed: int) -> Iterator[tuple[str, tuple]]:
+    rng = random.Random(seed)
+    yield from case_processors(rng, size, mix).items()
+    yield from case_streams(rng, size, mix, batch).items()
+    yield from case_nexus(rng, size, mix).items()
+    yield from case_fusion(rng, size, mix).items()
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict],
+            threshold: float) -> list[str]:
+    """List the cases which regressed against the baseline.
+
+    Args:
+        results (dict[str, dict]): Results of this run
+        baseline (dict[str, dict]): Results loaded from the baseline file
+        threshold (float): Allowed relative degradation, 0.1 for 10%
+
+    Returns:
+        list[str]: One message per regression
+    """
+    regressions = []
+    for name, current in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        checks = [
+            ("records/s", old["records_per_sec"], current["records_per_sec"],
+             False),
+            ("p95", max(old["p95_ms"], MIN_LATENCY_MS),
+             max(current["p95_ms"], MIN_LATENCY_MS), True),
+            ("peak memory", old["peak_kib"], current["peak_kib"], True)
+        ]
+        for label, before, now, higher_is_worse in checks:
+            if before <= 0:
+                continue
+            change = (now - before) / before
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append(f"{name}: {label} {before} -> {now}"
+                                   f" ({change:+.1%})")
+    return regressions
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = dict(DEFAULT_MIX)
+    if not text:
+        return mix
+    mix = {kind: 0 for kind in DEFAULT_MIX}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown record kind: {kind.strip()}")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Code Nexus"
+                                     " hot paths")
+    parser.add_argument("--size", type=int, default=2000,
+                        help="records generated per case")
+    parser.add_argument("--mix", default="",
+                        help="weights of the record kinds, e.g. json=3,csv=1")
+    parser.add_argument("--batch", type=int, default=50,
+                        help="stream items per dispatch_sensors batch")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", default="",
+                        help="comma separated substrings of case names")
+    parser.add_argument("--repeat", type=int, default=15,
+                        help="timed passes per case, the best one is kept")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON baseline to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed degradation before flagging, 0.1=10%%")
+    args = parser.parse_args()
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    only = [name.lower() for name in args.only.split(",") if name]
+    results: dict[str, dict] = {}
+    print(f"{'case':45} {'rec/s':>11} {'p50 ms':>9} {'p95 ms':>9}"
+          f" {'p99 ms':>9} {'peak KiB':>9}")
+    cases = [(name, case) for name, case in build_cases(
+        args.size, mix, args.batch, args.seed)
+        if not only or any(part in name.lower() for part in only)]
+    if not cases:
+        parser.error(f"--only {args.only} matches no case")
+    # The passes of the cases are interleaved, so that a slow spell of
+    # the machine doesn't fall on every pass of the same case
+    for index in range(args.repeat):
+        for name, (func, inputs, per_call) in cases:
+            results[name] = keep_best(results.get(name), measure(
+                func, inputs, per_call, trace=index == 0))
+    for name, res in results.items():
+        print(f"{name:45} {res['records_per_sec']:>11} {res['p50_ms']:>9}"
+              f" {res['p95_ms']:>9} {res['p99_ms']:>9} {res['peak_kib']:>9}")
+    sizes = footprint(random.Random(args.seed), max(args.size, 1))
+    print(f"\nSensor reading footprint: {sizes['tuple_bytes_per_reading']}"
+          f" bytes as a tuple, {sizes['column_bytes_per_reading']} bytes"
+          " in SensorReadings columns")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "size": args.size,
+                    "mix": mix,
+                    "seed": args.seed,
+                    "repeat": args.repeat,
+                    "footprint": sizes
+                },
+                "results": results
+            }, file, indent=2)
+        print(f"\nBaseline written to {args.save}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond"
+                  f" {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regression beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,7 +11,13 @@
 # ****************************************************************************#
 
 from abc import ABC, abstractmethod
-from typing import Any
+from array import array
+from typing import Any, Callable
+import hashlib
+import math
+import struct
+import sys
+import time
 
 
 class DataError(Exception):
@@ -32,7 +38,513 @@ class EventError(DataError):
     pass
 
 
+class WireError(DataError):
+    pass
+
+
+class PackedEvents:
+    """Events of a wire batch: one byte code per event and the table
+    giving the name behind each code.
+    """
+
+    def __init__(self, codes: array, table: tuple[str, ...]) -> None:
+        self.codes = codes
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def code(self, name: str) -> int:
+        return self.table.index(name) if name in self.table else -1
+
+    def count(self, name: str) -> int:
+        code = self.code(name)
+        return self.codes.count(code) if code >= 0 else 0
+
+    def names(self, limit: int) -> list[str]:
+        return [self.table[code] for code in self.codes[:limit]]
+
+    def select(self, code: int, keep: bool) -> "PackedEvents":
+        """Keep the events with this code, or all the others if keep is
+        False.
+        """
+        return PackedEvents(array("B", (c for c in self.codes
+                                        if (c == code) == keep)), self.table)
+
+
+class SensorReadings:
+    """Columnar buffer of sensor readings: one float64 array per measure
+    instead of one tuple of three boxed floats per reading (8 bytes per
+    value instead of about 24, plus the 64 bytes of the tuple). Appends
+    use the over-allocation of array, so growing is amortized O(1).
+    """
+
+    __slots__ = ("temp", "humidity", "pressure")
+
+    def __init__(self, temp: array | None = None,
+                 humidity: array | None = None,
+                 pressure: array | None = None) -> None:
+        self.temp = temp if temp is not None else array("d")
+        self.humidity = humidity if humidity is not None else array("d")
+        self.pressure = pressure if pressure is not None else array("d")
+
+    @classmethod
+    def build(cls, readings: list[tuple] | array) -> "SensorReadings":
+        """Build the columns from a list of (temp, humidity, pressure)
+        tuples or from the flat float64 buffer of a wire batch.
+        """
+        if isinstance(readings, array):
+            return cls(readings[0::3], readings[1::3], readings[2::3])
+        columns = cls()
+        for t, h, p in readings:
+            columns.append(t, h, p)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.temp)
+
+    def append(self, temp: float, humidity: float, pressure: float) -> None:
+        self.temp.append(temp)
+        self.humidity.append(humidity)
+        self.pressure.append(pressure)
+
+    def extend(self, other: "SensorReadings") -> None:
+        self.temp.extend(other.temp)
+        self.humidity.extend(other.humidity)
+        self.pressure.extend(other.pressure)
+
+    def select(self, indexes: list[int]) -> "SensorReadings":
+        """Copy the readings at the given positions in new columns"""
+        return SensorReadings(array("d", [self.temp[i] for i in indexes]),
+                              array("d", [self.humidity[i] for i in indexes]),
+                              array("d", [self.pressure[i] for i in indexes]))
+
+    def view(self, start: int, stop: int) -> tuple[memoryview, memoryview,
+                                                   memoryview]:
+        """Get the readings from start to stop without copying them. The
+        columns can't grow while a view is alive.
+        """
+        return (memoryview(self.temp)[start:stop],
+                memoryview(self.humidity)[start:stop],
+                memoryview(self.pressure)[start:stop])
+
+
+class SensorHistory:
+    """The last size readings of a stream, in a ring buffer: the columns
+    are allocated once and never resized, new readings overwrite the
+    oldest ones in place.
+    """
+
+    __slots__ = ("size", "temp", "humidity", "pressure", "__next",
+                 "__count")
+
+    def __init__(self, size: int) -> None:
+        if size < 1:
+            raise SensorError("A sensor history keeps at least one reading")
+        self.size = size
+        zeros = bytes(8 * size)
+        self.temp = array("d", zeros)
+        self.humidity = array("d", zeros)
+        self.pressure = array("d", zeros)
+        self.__next = 0
+        self.__count = 0
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def extend(self, readings: SensorReadings) -> None:
+        size = self.size
+        new = len(readings)
+        if new >= size:
+            for column, values in self.__pairs(readings):
+                column[:] = values[new - size:]
+            self.__next = 0
+            self.__count = size
+            return
+        # The readings which don't fit before the end wrap to the start
+        first = min(new, size - self.__next)
+        start = self.__next
+        for column, values in self.__pairs(readings):
+            column[start:start + first] = values[:first]
+            column[:new - first] = values[first:]
+        self.__next = (start + new) % size
+        self.__count = min(self.__count + new, size)
+
+    def window(self) -> SensorReadings:
+        """Copy the readings kept, oldest first, in new columns"""
+        start = (self.__next - self.__count) % self.size
+        stop = start + self.__count
+        if stop <= self.size:
+            return SensorReadings(self.temp[start:stop],
+                                  self.humidity[start:stop],
+                                  self.pressure[start:stop])
+        stop -= self.size
+        return SensorReadings(self.temp[start:] + self.temp[:stop],
+                              self.humidity[start:] + self.humidity[:stop],
+                              self.pressure[start:] + self.pressure[:stop])
+
+    def __pairs(self, readings: SensorReadings) -> list[tuple[array, array]]:
+        return [(self.temp, readings.temp),
+                (self.humidity, readings.humidity),
+                (self.pressure, readings.pressure)]
+
+
+MASK64 = (1 << 64) - 1
+
+
+def _mix64(value: int) -> int:
+    """splitmix64 finalizer: spread the bits of a 64 bits integer"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def _hash64(item: Any) -> int:
+    """Hash which, unlike hash() on strings, is the same in every process,
+    so that sketches built apart can be merged.
+    """
+    if isinstance(item, int):
+        return _mix64(item & MASK64)
+    data = item.encode() if isinstance(item, str) else repr(item).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(),
+                          "little")
+
+
+class CountMinSketch:
+    """Approximate frequency of items in fixed memory.
+
+    An estimate is never below the true count, and is above it by at most
+    epsilon * total with probability 1 - delta.
+    """
+
+    __slots__ = ("width", "depth", "seed", "total", "__table", "__salt",
+                 "__rows")
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01,
+                 seed: int = 0) -> None:
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise DataError("Sketch epsilon and delta must be in ]0, 1[")
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.seed = seed
+        self.total = 0
+        self.__table = array("q", bytes(8 * self.width * self.depth))
+        self.__salt = _mix64(seed)
+        self.__rows = [(row, row * self.width) for row in range(self.depth)]
+
+    def __cells(self, item: Any) -> list[int]:
+        # Two halves of one hash give the depth rows (Kirsch-Mitzenmacher)
+        hashed = _mix64(_hash64(item) ^ self.__salt)
+        first = hashed & 0xFFFFFFFF
+        second = (hashed >> 32) | 1
+        width = self.width
+        return [start + (first + row * second) % width
+                for row, start in self.__rows]
+
+    def add(self, item: Any, count: int = 1) -> None:
+        table = self.__table
+        for cell in self.__cells(item):
+            table[cell] += count
+        self.total += count
+
+    def estimate(self, item: Any) -> int:
+        table = self.__table
+        return min(table[cell] for cell in self.__cells(item))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (self.width, self.depth, self.seed) !=\
+                (other.width, other.depth, other.seed):
+            raise DataError("Only sketches of the same shape can be merged")
+        table = self.__table
+        for cell, count in enumerate(other.__table):
+            table[cell] += count
+        self.total += other.total
+
+    def memory(self) -> int:
+        return self.__table.itemsize * len(self.__table)
+
+
+class RangeCountMin:
+    """Approximate count of the integers falling in a range.
+
+    Values are clamped to a signed bits wide domain and counted at every
+    level of a tree where each level groups 2 ** level_bits keys of the
+    level below (key >> (level * level_bits)). A range is the sum of at
+    most 2 * (2 ** level_bits - 1) counts per level. Levels small enough
+    are counted exactly, the others in a CountMinSketch, which bounds the
+    error of a range count by that number of counts * epsilon * total.
+    A wider level_bits makes add() cheaper and count_range() dearer.
+    """
+
+    __slots__ = ("bits", "level_bits", "total", "__levels")
+
+    def __init__(self, bits: int = 32, epsilon: float = 0.001,
+                 delta: float = 0.01, level_bits: int = 4) -> None:
+        self.bits = bits
+        self.level_bits = level_bits
+        self.total = 0
+        self.__levels: list[CountMinSketch | array] = []
+        for level in range(math.ceil(bits / level_bits)):
+            sketch = CountMinSketch(epsilon, delta, seed=level)
+            size = 1 << max(bits - level * level_bits, 0)
+            if size <= sketch.width * sketch.depth:
+                self.__levels.append(array("q", bytes(8 * size)))
+            else:
+                self.__levels.append(sketch)
+
+    def __key(self, value: int) -> int:
+        half = 1 << (self.bits - 1)
+        return min(max(value, -half), half - 1) + half
+
+    def add(self, value: int, count: int = 1) -> None:
+        key = self.__key(value)
+        for counter in self.__levels:
+            if isinstance(counter, array):
+                counter[key] += count
+            else:
+                counter.add(key, count)
+            key >>= self.level_bits
+        self.total += count
+
+    def __count(self, level: int, key: int) -> int:
+        counter = self.__levels[level]
+        if isinstance(counter, array):
+            return counter[key]
+        return counter.estimate(key)
+
+    def count_range(self, low: int, high: int) -> int:
+        """Estimate how many values are in [low, high]"""
+        if low > high:
+            return 0
+        low = self.__key(low)
+        high = self.__key(high)
+        shift = self.level_bits
+        mask = (1 << shift) - 1
+        total = 0
+        level = 0
+        while True:
+            if low >> shift == high >> shift:
+                return total + sum(self.__count(level, key)
+                                   for key in range(low, high + 1))
+            # Count the keys up to the first full group, and from the last
+            while low & mask:
+                total += self.__count(level, low)
+                low += 1
+            while high & mask != mask:
+                total += self.__count(level, high)
+                high -= 1
+            low >>= shift
+            high >>= shift
+            level += 1
+
+    def merge(self, other: "RangeCountMin") -> None:
+        if (self.bits, self.level_bits) != (other.bits, other.level_bits):
+            raise DataError("Only sketches of the same shape can be merged")
+        for mine, theirs in zip(self.__levels, other.__levels):
+            if isinstance(mine, array):
+                for key, count in enumerate(theirs):
+                    mine[key] += count
+            else:
+                mine.merge(theirs)
+        self.total += other.total
+
+    def memory(self) -> int:
+        return sum(counter.itemsize * len(counter)
+                   if isinstance(counter, array) else counter.memory()
+                   for counter in self.__levels)
+
+
+class SpaceSaving:
+    """Most frequent items with at most counters items tracked.
+
+    A count is above the true one by at most its error, and any item seen
+    more than total / counters times is tracked.
+    """
+
+    __slots__ = ("counters", "total", "__counts", "__errors")
+
+    def __init__(self, counters: int = 100) -> None:
+        if counters < 1:
+            raise DataError("Space-Saving needs at least one counter")
+        self.counters = counters
+        self.total = 0
+        self.__counts: dict[Any, int] = {}
+        self.__errors: dict[Any, int] = {}
+
+    def add(self, item: Any, count: int = 1) -> None:
+        counts = self.__counts
+        self.total += count
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.counters:
+            counts[item] = count
+            self.__errors[item] = 0
+        else:
+            # The newcomer takes the place, and the count, of the smallest
+            victim = min(counts, key=counts.__getitem__)
+            floor = counts.pop(victim)
+            del self.__errors[victim]
+            counts[item] = floor + count
+            self.__errors[item] = floor
+
+    def top(self, size: int) -> list[tuple[Any, int, int]]:
+        """Get the size most frequent items.
+
+        Returns:
+            list[tuple[Any, int, int]]: Item, estimated count and maximum
+            overestimation, most frequent first
+        """
+        best = sorted(self.__counts.items(), key=lambda pair: -pair[1])
+        return [(item, count, self.__errors[item])
+                for item, count in best[:size]]
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """Merge the counters of another summary, keeping the largest"""
+        def floor(summary: "SpaceSaving") -> int:
+            if len(summary.__counts) < summary.counters:
+                return 0
+            return min(summary.__counts.values())
+
+        mine, theirs = floor(self), floor(other)
+        merged: dict[Any, tuple[int, int]] = {}
+        for item in self.__counts.keys() | other.__counts.keys():
+            count = self.__counts.get(item, mine) +\
+                other.__counts.get(item, theirs)
+            error = self.__errors.get(item, mine) +\
+                other.__errors.get(item, theirs)
+            merged[item] = (count, error)
+        best = sorted(merged.items(), key=lambda pair: -pair[1][0])
+        best = best[:self.counters]
+        self.__counts = {item: count for item, (count, _) in best}
+        self.__errors = {item: error for item, (_, error) in best}
+        self.total += other.total
+
+
+class HyperLogLog:
+    """Approximate number of distinct items in 2 ** precision bytes, with
+    a standard error of about 1.04 / sqrt(2 ** precision).
+    """
+
+    __slots__ = ("precision", "__registers")
+
+    def __init__(self, error: float = 0.02) -> None:
+        if not 0 < error < 1:
+            raise DataError("HyperLogLog error must be in ]0, 1[")
+        precision = math.ceil(math.log2((1.04 / error) ** 2))
+        self.precision = min(max(precision, 4), 16)
+        self.__registers = bytearray(1 << self.precision)
+
+    def add(self, item: Any) -> None:
+        hashed = _hash64(item)
+        rest_bits = 64 - self.precision
+        index = hashed >> rest_bits
+        rest = hashed & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.__registers[index]:
+            self.__registers[index] = rank
+
+    def estimate(self) -> int:
+        registers = self.__registers
+        size = len(registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(
+            size, 0.7213 / (1 + 1.079 / size))
+        raw = alpha * size * size / sum(2.0 ** -rank for rank in registers)
+        zeros = registers.count(0)
+        if raw <= 2.5 * size and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return round(size * math.log(size / zeros))
+        return round(raw)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if self.precision != other.precision:
+            raise DataError("Only sketches of the same shape can be merged")
+        self.__registers = bytearray(map(max, self.__registers,
+                                         other.__registers))
+
+    def memory(self) -> int:
+        return len(self.__registers)
+
+
+class TransactionSketches:
+    """Optional sketches of a TransactionStream: counts of amounts by
+    range and the most frequent amounts.
+    """
+
+    __slots__ = ("amounts", "top", "top_k")
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01,
+                 top_k: int = 20, counters: int = 100,
+                 bits: int = 32) -> None:
+        self.amounts = RangeCountMin(bits, epsilon, delta)
+        self.top = SpaceSaving(max(counters, top_k))
+        self.top_k = top_k
+
+    def update(self, amount: int) -> None:
+        self.amounts.add(amount)
+        self.top.add(amount)
+
+    def merge(self, other: "TransactionSketches") -> None:
+        self.amounts.merge(other.amounts)
+        self.top.merge(other.top)
+
+    def get_stats(self, buys_above: int | None = None) -> dict[str, Any]:
+        """top_amounts holds (amount, count, error) tuples: the true count
+        is between count - error and count.
+        """
+        stats: dict[str, Any] = {
+            "top_amounts": self.top.top(self.top_k),
+            "sketch_bytes": self.amounts.memory()
+        }
+        if buys_above is not None:
+            # A buy is a negative amount, a buy above X is below -X
+            stats["buys_above"] = self.amounts.count_range(
+                -(1 << (self.amounts.bits - 1)), -abs(buys_above) - 1)
+        return stats
+
+
+class EventSketches:
+    """Optional sketches of an EventStream: distinct event kinds of each
+    source and the most frequent events.
+    """
+
+    __slots__ = ("error", "kinds", "top", "top_k")
+
+    def __init__(self, error: float = 0.02, top_k: int = 20,
+                 counters: int = 100) -> None:
+        self.error = error
+        self.kinds: dict[str, HyperLogLog] = {}
+        self.top = SpaceSaving(max(counters, top_k))
+        self.top_k = top_k
+
+    def update(self, source: str, event: str) -> None:
+        kinds = self.kinds.get(source)
+        if kinds is None:
+            kinds = self.kinds[source] = HyperLogLog(self.error)
+        kinds.add(event)
+        self.top.add(event)
+
+    def merge(self, other: "EventSketches") -> None:
+        for source, kinds in other.kinds.items():
+            if source not in self.kinds:
+                self.kinds[source] = HyperLogLog(self.error)
+            self.kinds[source].merge(kinds)
+        self.top.merge(other.top)
+
+    def get_stats(self) -> dict[str, Any]:
+        """top_events holds (event, count, error) tuples: the true count
+        is between count - error and count.
+        """
+        return {
+            "distinct_kinds": {source: kinds.estimate()
+                               for source, kinds in self.kinds.items()},
+            "top_events": self.top.top(self.top_k)
+        }
+
+
 class DataStream(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def process_batch(self, data_batch: list[Any]) -> str:
         """This function process all datas passed in the batch
@@ -70,63 +582,81 @@ class DataStream(ABC):
 
 
 class SensorStream(DataStream):
-    def __init__(self, id: str) -> None:
+    __slots__ = ("__total_temp", "__total_humidity", "__total_pressure",
+                 "__total_ope", "id", "type", "__errors", "history",
+                 "readings")
+
+    def __init__(self, id: str, history: int = 0) -> None:
         self.__total_temp = 0
         self.__total_humidity = 0
         self.__total_pressure = 0
         self.__total_ope = 0
         self.id = id
         self.type = "Environmental Data"
-        self.__errors: list[list[tuple]] = []
+        self.__errors: list[SensorReadings] = []
+        self.history = history
+        self.readings = SensorHistory(history) if history > 0 else None
 
-    def process_batch(self, data_batch: list[tuple]) -> str:
-        total_temp = 0
-        total_ope = 0
+    def process_batch(self, data_batch: SensorReadings | list[tuple] | array)\
+            -> str:
         print("\nInitializing Sensor Stream...")
         print(f"Stream ID: {self.id}, Type: Environmental Data")
-        for tup in data_batch:
-            t, h, p = tup
+        if not isinstance(data_batch, SensorReadings):
+            data_batch = SensorReadings.build(data_batch)
+        for t, h, p in zip(data_batch.temp, data_batch.humidity,
+                           data_batch.pressure):
             print(f"Processing sensor batch: [temp: {t}, humidity: {h},"
                   f" pressure: {p}]")
-            total_temp += t
-            total_ope += 1
-            self.__total_humidity += h
-            self.__total_pressure += p
-            self.__total_temp += t
-            self.__total_ope += 1
+        total_ope = len(data_batch)
+        total_temp = sum(data_batch.temp)
+        self.__total_temp += total_temp
+        self.__total_humidity += sum(data_batch.humidity)
+        self.__total_pressure += sum(data_batch.pressure)
+        self.__total_ope += total_ope
+        if self.readings is not None:
+            self.readings.extend(data_batch)
+        avg_temp = round(float(total_temp / total_ope), 2) if total_ope\
+            else 0
         return f"Sensor analysis: {total_ope} readings processed,"\
-               f" avg temp: {round(float(total_temp / total_ope), 2)}°C"
+               f" avg temp: {avg_temp}°C"
 
-    def filter_data(self, data_batch: list[Any],
-                    criteria: str | None) -> list[tuple]:
-        clean_datas: list[tuple] = []
+    def filter_data(self, data_batch: list[Any] | array,
+                    criteria: str | None) -> SensorReadings:
         self.__errors = []
-        for datas in data_batch:
-            is_valid = True
-            try:
-                if not isinstance(datas, tuple):
-                    is_valid = False
-                    raise SensorError("All sensor datas must be tuples")
-                for data in datas:
-                    if not isinstance(data, float):
-                        is_valid = False
-                        raise SensorError("All sensor datas must be float")
-            except SensorError as e:
-                print(e)
-            if is_valid:
-                clean_datas.append(datas)
+        if isinstance(data_batch, array):
+            clean_datas = SensorReadings.build(data_batch)
+        else:
+            clean_datas = SensorReadings()
+            for datas in data_batch:
+                try:
+                    if not isinstance(datas, tuple):
+                        raise SensorError("All sensor datas must be tuples")
+                    for data in datas:
+                        if not isinstance(data, float):
+                            raise SensorError("All sensor datas must be"
+                                              " float")
+                    if len(datas) != 3:
+                        raise SensorError("Sensor datas must be"
+                                          " (temperature, humidity,"
+                                          " pressure)")
+                    clean_datas.append(*datas)
+                except SensorError as e:
+                    print(e)
         if criteria and isinstance(criteria, str) and len(criteria) > 1:
             try:
+                temps = clean_datas.temp
                 if criteria[0] == ">":
-                    self.__errors.append([data for data in clean_datas
-                                          if data[0] < float(criteria[1:])])
-                    return [data for data in clean_datas if data[0] >
-                            float(criteria[1:])]
+                    limit = float(criteria[1:])
+                    self.__errors.append(clean_datas.select(
+                        [i for i, t in enumerate(temps) if t < limit]))
+                    return clean_datas.select(
+                        [i for i, t in enumerate(temps) if t > limit])
                 elif criteria[0] == "<":
-                    self.__errors.append([data for data in clean_datas
-                                          if data[0] > float(criteria[1:])])
-                    return [data for data in clean_datas if data[0] <
-                            float(criteria[1:])]
+                    limit = float(criteria[1:])
+                    self.__errors.append(clean_datas.select(
+                        [i for i, t in enumerate(temps) if t > limit]))
+                    return clean_datas.select(
+                        [i for i, t in enumerate(temps) if t < limit])
                 else:
                     raise SensorError("Sensor filter must be in"
                                       " '<sup/inf> <float>' format")
@@ -135,9 +665,10 @@ class SensorStream(DataStream):
         return super().filter_data(clean_datas, criteria)
 
     def get_stats(self) -> dict[str, int | str | float]:
-        avg_temp = round(float(self.__total_temp / self.__total_ope), 2)
-        avg_hum = round(float(self.__total_humidity / self.__total_ope), 2)
-        avg_pre = round(float(self.__total_pressure / self.__total_ope), 2)
+        ope = self.__total_ope
+        avg_temp = round(float(self.__total_temp / ope), 2) if ope else 0
+        avg_hum = round(float(self.__total_humidity / ope), 2) if ope else 0
+        avg_pre = round(float(self.__total_pressure / ope), 2) if ope else 0
         return {
             "avg_temp": avg_temp,
             "avg_hum": avg_hum,
@@ -146,9 +677,22 @@ class SensorStream(DataStream):
             "errors": len(self.__errors)
         }
 
+    def window(self) -> SensorReadings:
+        """Get a copy of the last history readings, oldest first: fewer
+        while the stream has not received that many, none without history.
+        """
+        if self.readings is None:
+            return SensorReadings()
+        return self.readings.window()
+
 
 class TransactionStream(DataStream):
-    def __init__(self, id: str) -> None:
+    __slots__ = ("__total_sell_value", "__total_sell", "__total_buy_value",
+                 "__total_buy", "__total_ope", "id", "type", "__errors",
+                 "sketches")
+
+    def __init__(self, id: str,
+                 sketches: TransactionSketches | None = None) -> None:
         self.__total_sell_value = 0
         self.__total_sell = 0
         self.__total_buy_value = 0
@@ -157,8 +701,9 @@ class TransactionStream(DataStream):
         self.id = id
         self.type = "Financial Data"
         self.__errors: list[list[int]] = []
+        self.sketches = sketches
 
-    def process_batch(self, data_batch: list[int]) -> str:
+    def process_batch(self, data_batch: list[int] | array) -> str:
         print("\nInitializing Transaction Stream...")
         print(f"Stream ID: {self.id}, Type: Financial Data")
         total_sell = 0
@@ -166,9 +711,12 @@ class TransactionStream(DataStream):
         total_ope = 0
         sign = ""
         message = ""
+        sketches = self.sketches
         for ope in data_batch:
             self.__total_ope += 1
             total_ope += 1
+            if sketches is not None:
+                sketches.update(ope)
             if ope < 0:
                 if total_ope < 4:
                     message += f"buy:{ope}, "
@@ -187,8 +735,10 @@ class TransactionStream(DataStream):
         return f"Transaction analysis: {total_ope} operations,"\
                f" net flow: {sign}{total_sell + total_buy} units"
 
-    def filter_data(self, data_batch: list[Any],
-                    criteria: str | None) -> list[int]:
+    def filter_data(self, data_batch: list[Any] | array,
+                    criteria: str | None) -> list[int] | array:
+        if isinstance(data_batch, array):
+            return self.__filter_packed(data_batch, criteria)
         clean_datas: list[list[int]] = []
         self.__errors = []
         for datas in data_batch:
@@ -228,39 +778,102 @@ class TransactionStream(DataStream):
         return super().filter_data([data for datas in clean_datas for data
                                     in datas], criteria)
 
-    def get_stats(self) -> dict[str, int | str | float]:
+    def __filter_packed(self, operations: array,
+                        criteria: str | None) -> array:
+        """Same filter as filter_data for the int64 buffer of a wire batch,
+        which is already flat and needs no type check.
+        """
+        self.__errors = []
+        if criteria and isinstance(criteria, str) and len(criteria) > 1:
+            try:
+                if criteria[0] == ">":
+                    limit = int(criteria[1:])
+                    self.__errors.append(array("q", (data for data in
+                                                     operations
+                                                     if data < limit)))
+                    return array("q", (data for data in operations
+                                       if data > limit))
+                elif criteria[0] == "<":
+                    limit = int(criteria[1:])
+                    self.__errors.append(array("q", (data for data in
+                                                     operations
+                                                     if data > limit)))
+                    return array("q", (data for data in operations
+                                       if data < limit))
+                else:
+                    raise FinancialError("Financial filter must be in"
+                                         " '<sup/inf> <int>' format")
+            except (ValueError, DataError) as e:
+                print(e)
+        return operations
+
+    def get_stats(self, buys_above: int | None = None)\
+            -> dict[str, int | str | float]:
+        """Get stats of the instance, with the sketch results if the stream
+        has sketches.
+
+        Args:
+            buys_above (int | None): Also estimate how many buys were
+            bigger than this amount
+
+        Returns:
+            dict[str, int | str | float]: Return a dict which contain datas
+            of the object in keys
+        """
         avg_sell = round(self.__total_sell / self.__total_sell_value, 2) if\
                    self.__total_sell_value > 0 else 0
         avg_buy = round(self.__total_buy / self.__total_buy_value, 2) if\
             self.__total_buy_value > 0 else 0
         final_result = self.__total_sell + self.__total_buy
-        return {
+        stats = {
             "avg_sell": avg_sell,
             "avg_buy": avg_buy,
             "final_result": final_result,
             "total": self.__total_ope,
             "errors": len(self.__errors)
         }
+        if self.sketches is not None:
+            stats.update(self.sketches.get_stats(buys_above))
+        return stats
 
 
 class EventStream(DataStream):
-    def __init__(self, id: str) -> None:
+    __slots__ = ("__total_login", "__total_logout", "__total_error",
+                 "__total_ope", "id", "__errors", "sketches")
+
+    def __init__(self, id: str,
+                 sketches: EventSketches | None = None) -> None:
         self.__total_login = 0
         self.__total_logout = 0
         self.__total_error = 0
         self.__total_ope = 0
         self.id = id
         self.__errors: list[list[str]] = []
+        self.sketches = sketches
 
-    def process_batch(self, data_batch: list[str]) -> str:
+    def process_batch(self, data_batch: list[str] | PackedEvents) -> str:
         print("\nInitializing Event Stream...")
         print(f"Stream ID: {self.id}, Type: System Events")
         total_errors = 0
         total_ope = 0
+        if isinstance(data_batch, PackedEvents):
+            print(f"Processing event batch: {data_batch.names(3)} ...")
+            if self.sketches is not None:
+                for code in data_batch.codes:
+                    self.sketches.update(self.id, data_batch.table[code])
+            self.__total_ope += len(data_batch)
+            self.__total_login += data_batch.count("login")
+            self.__total_logout += data_batch.count("logout")
+            total_errors = data_batch.count("error")
+            self.__total_error += total_errors
+            return f"Event analysis: {len(data_batch)} event(s),"\
+                   f" {total_errors}error(s) detected"
         print(f"Processing event batch: {data_batch[:3]} ...")
         for ope in data_batch:
             self.__total_ope += 1
             total_ope += 1
+            if self.sketches is not None:
+                self.sketches.update(self.id, ope)
             match ope:
                 case "login":
                     self.__total_login += 1
@@ -272,8 +885,10 @@ class EventStream(DataStream):
         return f"Event analysis: {total_ope} event(s), {total_errors}"\
                "error(s) detected"
 
-    def filter_data(self, data_batch: list[Any],
-                    criteria: str | None) -> list[str]:
+    def filter_data(self, data_batch: list[Any] | PackedEvents,
+                    criteria: str | None) -> list[str] | PackedEvents:
+        if isinstance(data_batch, PackedEvents):
+            return self.__filter_packed(data_batch, criteria)
         clean_datas: list[list[str]] = []
         self.__errors = []
         for datas in data_batch:
@@ -307,96 +922,539 @@ class EventStream(DataStream):
         return super().filter_data([data for datas in clean_datas for data
                                     in datas], criteria)
 
+    def __filter_packed(self, events: PackedEvents,
+                        criteria: str | None) -> PackedEvents:
+        """Same filter as filter_data for the event codes of a wire batch,
+        comparing codes instead of strings.
+        """
+        self.__errors = []
+        if criteria and isinstance(criteria, str):
+            try:
+                if criteria.lower() in ["error", "logout", "login"]:
+                    code = events.code(criteria.lower())
+                    self.__errors.append(events.select(code, False))
+                    return events.select(code, True)
+                else:
+                    raise EventError("Event filter must be in '<event>'"
+                                     " format")
+            except (ValueError, DataError) as e:
+                print(e)
+        return events
+
     def get_stats(self) -> dict[str, int | str | float]:
         total_errors = self.__total_error
         total_login = self.__total_login
         total_logout = self.__total_logout
-        return {
+        stats = {
             "total_errors": total_errors,
             "total_login": total_login,
             "total_logout": total_logout,
             "total": self.__total_ope,
             "errors": len(self.__errors)
         }
+        if self.sketches is not None:
+            stats.update(self.sketches.get_stats())
+        return stats
 
 
-class StreamProcessor:
+# Wire format, all integers little-endian:
+#   header    magic "NXSB", version u8, flags u8, section count u16
+#   section   kind u8, item count u32, then the payload of the kind
+#   sensor    count * 3 float64 (temperature, humidity, pressure)
+#   transac.  count u32 list lengths, then sum(lengths) int64 operations
+#   event     table size u16, each name as length u8 + utf-8 bytes,
+#             count u32 list lengths, then sum(lengths) u8 codes
+WIRE_MAGIC = b"NXSB"
+WIRE_VERSION = 1
+WIRE_HEADER = struct.Struct("<4sBBH")
+WIRE_SECTION = struct.Struct("<BI")
+WIRE_SENSOR = 1
+WIRE_TRANSACTION = 2
+WIRE_EVENT = 3
+EVENT_CODES = ("login", "logout", "error")
+
+
+def _to_wire(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_wire(typecode: str, payload: memoryview, offset: int,
+               count: int) -> tuple[array, int]:
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    if end > len(payload):
+        raise WireError("Truncated wire batch")
+    values.frombytes(payload[offset:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, end
+
+
+class WireBatch:
+    """Decoded wire batch, each stream's data kept in a typed buffer"""
+
     def __init__(self) -> None:
+        self.sensors = array("d")
+        self.transactions = array("q")
+        self.events = PackedEvents(array("B"), EVENT_CODES)
+
+
+def encode_batch(datas_batch: list) -> bytes:
+    """Encode a batch accepted by dispatch_sensors in the wire format.
+
+    Args:
+        datas_batch (list): Tuples of 3 floats, lists of int and lists of
+        strings
+
+    Raises:
+        DataError: Raise an error about an element which can't be encoded
+
+    Returns:
+        bytes: The framed batch
+    """
+    if not isinstance(datas_batch, list):
+        raise DataError("Batchs must be a list")
+    sensors = array("d")
+    trans_lengths = array("I")
+    trans_values = array("q")
+    event_lengths = array("I")
+    event_codes = array("B")
+    table: list[str] = list(EVENT_CODES)
+    for datas in datas_batch:
+        if isinstance(datas, tuple):
+            if len(datas) != 3 or\
+                    not all(isinstance(data, float) for data in datas):
+                raise SensorError("Sensor datas must be tuples of 3 floats")
+            sensors.extend(datas)
+        elif isinstance(datas, list) and datas and\
+                all(isinstance(data, str) for data in datas):
+            for data in datas:
+                if data not in table:
+                    table.append(data)
+                    if len(table) > 256 or len(data.encode()) > 255:
+                        raise EventError("Too many or too long events")
+                event_codes.append(table.index(data))
+            event_lengths.append(len(datas))
+        elif isinstance(datas, list) and datas and\
+                all(isinstance(data, int) for data in datas):
+            try:
+                trans_values.extend(datas)
+            except OverflowError:
+                raise FinancialError("Financial datas must fit in 64 bits")
+            trans_lengths.append(len(datas))
+        else:
+            raise DataError("Batch's elements must be either tuple,"
+                            " list of int or list of string,"
+                            " nothing else!")
+    parts = [WIRE_HEADER.pack(WIRE_MAGIC, WIRE_VERSION, 0, 3),
+             WIRE_SECTION.pack(WIRE_SENSOR, len(sensors) // 3),
+             _to_wire(sensors),
+             WIRE_SECTION.pack(WIRE_TRANSACTION, len(trans_lengths)),
+             _to_wire(trans_lengths), _to_wire(trans_values),
+             WIRE_SECTION.pack(WIRE_EVENT, len(event_lengths)),
+             struct.pack("<H", len(table))]
+    for name in table:
+        encoded = name.encode()
+        parts.append(struct.pack("<B", len(encoded)) + encoded)
+    parts += [_to_wire(event_lengths), event_codes.tobytes()]
+    return b"".join(parts)
+
+
+def decode_batch(payload: bytes) -> WireBatch:
+    """Decode a wire batch straight into typed buffers, without building
+    any per-record object.
+
+    Args:
+        payload (bytes): A frame made by encode_batch
+
+    Raises:
+        WireError: Raise an error about a malformed or unsupported frame
+
+    Returns:
+        WireBatch: The buffers ready to be sent to the streams
+    """
+    view = memoryview(payload)
+    batch = WireBatch()
+    try:
+        magic, version, _, sections = WIRE_HEADER.unpack_from(view, 0)
+        if magic != WIRE_MAGIC:
+            raise WireError("Not a wire batch")
+        if version != WIRE_VERSION:
+            raise WireError(f"Unsupported wire version {version}")
+        offset = WIRE_HEADER.size
+        for _ in range(sections):
+            kind, count = WIRE_SECTION.unpack_from(view, offset)
+            offset += WIRE_SECTION.size
+            if kind == WIRE_SENSOR:
+                batch.sensors, offset = _from_wire("d", view, offset,
+                                                   count * 3)
+            elif kind == WIRE_TRANSACTION:
+                lengths, offset = _from_wire("I", view, offset, count)
+                batch.transactions, offset = _from_wire("q", view, offset,
+                                                        sum(lengths))
+            elif kind == WIRE_EVENT:
+                (size,) = struct.unpack_from("<H", view, offset)
+                offset += 2
+                table = []
+                for _ in range(size):
+                    length = view[offset]
+                    name = str(view[offset + 1:offset + 1 + length], "utf-8")
+                    table.append(sys.intern(name))
+                    offset += 1 + length
+                lengths, offset = _from_wire("I", view, offset, count)
+                codes, offset = _from_wire("B", view, offset, sum(lengths))
+                if codes and max(codes) >= size:
+                    raise WireError("Unknown event code")
+                batch.events = PackedEvents(codes, tuple(table))
+            else:
+                raise WireError(f"Unknown section kind {kind}")
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise WireError("Truncated or corrupted wire batch")
+    if offset != len(view):
+        raise WireError("Trailing bytes after the wire batch")
+    return batch
+
+
+class TokenBucket:
+    """Allow rate operations per second on average, with bursts of up to
+    capacity operations.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "__last")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        if not rate > 0:
+            raise DataError("A token bucket needs a rate above 0")
+        if not capacity >= 1:
+            raise DataError("A token bucket needs room for one token")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.__last = time.monotonic()
+
+    def take(self, amount: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.__last) * self.rate)
+        self.__last = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def wait_time(self, amount: float = 1.0) -> float:
+        """Seconds until amount tokens are available"""
+        missing = amount - self.tokens -\
+            (time.monotonic() - self.__last) * self.rate
+        return max(missing / self.rate, 0.0)
+
+
+class AdmissionControl:
+    """Rate limit the entry of records, per stream type, by priority.
+
+    Each record gets a stream type and a priority from classify (lower is
+    more urgent). Records are admitted most urgent first while the token
+    bucket of their type has tokens. The others wait in a bounded queue
+    and are tried again, before the new ones, on the next call. When the
+    queue is full the policy decides what is dropped:
+    - "drop_new": the record which doesn't fit
+    - "drop_oldest": the record waiting for the longest time
+    - "drop_lowest": the least urgent record, the newest one on a tie
+    """
+
+    CRITICAL = 0
+    NORMAL = 1
+    POLICIES = ("drop_new", "drop_oldest", "drop_lowest")
+
+    def __init__(self, classify: Callable[[Any], tuple[str, int]],
+                 rates: dict[str, tuple[float, float]],
+                 queue_size: int = 100,
+                 policy: str = "drop_lowest") -> None:
+        """
+        Args:
+            classify (Callable[[Any], tuple[str, int]]): Give the stream
+            type and the priority of a record
+            rates (dict[str, tuple[float, float]]): Records per second and
+            burst size of each stream type, a type missing is not limited
+            queue_size (int): How many records can wait
+            policy (str): What to drop when the queue is full
+
+        Raises:
+            DataError: Raise an error about the policy, a rate which is not
+            above 0 or a burst size below 1
+        """
+        if policy not in AdmissionControl.POLICIES:
+            raise DataError(f"Shedding policy must be one of"
+                            f" {', '.join(AdmissionControl.POLICIES)}")
+        self.classify = classify
+        self.buckets = {kind: TokenBucket(rate, burst)
+                        for kind, (rate, burst) in rates.items()}
+        self.queue_size = queue_size
+        self.policy = policy
+        self.admitted = 0
+        self.deferred = 0
+        self.dropped = 0
+        self.__queue: list[tuple[int, int, str, Any, bool]] = []
+        self.__sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.__queue)
+
+    def admit(self, records: list[Any]) -> list[Any]:
+        """Get the records which may be processed now.
+
+        Args:
+            records (list[Any]): The new records
+
+        Returns:
+            list[Any]: Waiting and new records allowed in, most urgent first
+        """
+        candidates = self.__queue
+        self.__queue = []
+        for record in records:
+            kind, priority = self.classify(record)
+            candidates.append((priority, self.__sequence, kind, record,
+                               False))
+            self.__sequence += 1
+        candidates.sort(key=lambda candidate: candidate[:2])
+        admitted = []
+        for candidate in candidates:
+            bucket = self.buckets.get(candidate[2])
+            if bucket is None or bucket.take():
+                admitted.append(candidate[3])
+                self.admitted += 1
+            else:
+                self.__defer(candidate)
+        return admitted
+
+    def __defer(self, candidate: tuple[int, int, str, Any, bool]) -> None:
+        if not candidate[4]:
+            self.deferred += 1
+            candidate = candidate[:4] + (True,)
+        if len(self.__queue) < self.queue_size:
+            self.__queue.append(candidate)
+            return
+        self.dropped += 1
+        if self.policy == "drop_new":
+            return
+        if self.policy == "drop_oldest":
+            victim = min(self.__queue, key=lambda waiting: waiting[1])
+        else:
+            victim = max(self.__queue, key=lambda waiting: waiting[:2])
+            if victim[:2] < candidate[:2]:
+                return
+        self.__queue.remove(victim)
+        self.__queue.append(candidate)
+
+    def wait_time(self) -> float | None:
+        """Seconds until a waiting record can be admitted, None when no
+        record is waiting.
+        """
+        if not self.__queue:
+            return None
+        return min(self.buckets[waiting[2]].wait_time()
+                   for waiting in self.__queue)
+
+    def drain(self) -> list[Any]:
+        """Wait for the tokens the waiting records need and admit them all,
+        at the rate of their stream type.
+
+        Returns:
+            list[Any]: The records which were waiting
+        """
+        admitted = self.admit([])
+        while self.__queue:
+            time.sleep(self.wait_time() or 0.0)
+            admitted += self.admit([])
+        return admitted
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "admitted": self.admitted,
+            "deferred": self.deferred,
+            "dropped": self.dropped,
+            "waiting": len(self.__queue)
+        }
+
+
+def classify_stream_item(datas: Any,
+                         normal_range: tuple[float, float] = (20.0, 30.0))\
+        -> tuple[str, int]:
+    """Stream type and priority of a dispatch_sensors element: a reading
+    out of the normal temperature range and an event list with an error
+    are critical.
+    """
+    if isinstance(datas, tuple):
+        low, high = normal_range
+        critical = bool(datas) and isinstance(datas[0], float) and\
+            not low < datas[0] < high
+        return "sensor", AdmissionControl.CRITICAL if critical else\
+            AdmissionControl.NORMAL
+    if isinstance(datas, list) and datas and isinstance(datas[0], str):
+        critical = any(isinstance(data, str) and data.lower() == "error"
+                       for data in datas)
+        return "event", AdmissionControl.CRITICAL if critical else\
+            AdmissionControl.NORMAL
+    if isinstance(datas, list):
+        return "transaction", AdmissionControl.NORMAL
+    return "other", AdmissionControl.NORMAL
+
+
+class StreamProcessor:
+    def __init__(self, admission: AdmissionControl | None = None) -> None:
         self.__batch = 0
         self.sensor = SensorStream("SENSOR_001")
         self.trans = TransactionStream("TRANS_001")
         self.event = EventStream("EVENT_001")
+        self.admission = admission
 
     def dispatch_sensors(self, datas_batch: list, criteria_one: str | None,
                          criteria_two: str | None, criteria_three: str | None)\
             -> None:
+        """Send each stream its part of the batch, then print the stats.
+
+        With admission control, the records which waited since an earlier
+        call go first and are filtered with the criteria of this call, not
+        those of the call which brought them. drain() processes the ones
+        still waiting after the last batch.
+
+        Args:
+            datas_batch (list): Tuples of 3 floats, lists of int and lists
+            of strings
+            criteria_one (str | None): Filter of the sensor stream
+            criteria_two (str | None): Filter of the transaction stream
+            criteria_three (str | None): Filter of the event stream
+        """
+        self.__batch += 1
+        try:
+            if not isinstance(datas_batch, list):
+                raise DataError("Batchs must be a list")
+            if self.admission is not None:
+                datas_batch = self.admission.admit(datas_batch)
+            self.__run_streams(self.__sort(datas_batch), criteria_one,
+                               criteria_two, criteria_three)
+        except DataError as e:
+            print(e)
+
+    def drain(self, criteria_one: str | None, criteria_two: str | None,
+              criteria_three: str | None) -> None:
+        """Process the records still waiting in admission control, waiting
+        for the tokens they need. Like in dispatch_sensors, they are
+        filtered with the criteria of this call.
+
+        Args:
+            criteria_one (str | None): Filter of the sensor stream
+            criteria_two (str | None): Filter of the transaction stream
+            criteria_three (str | None): Filter of the event stream
+        """
+        if self.admission is None or not len(self.admission):
+            return
+        self.__batch += 1
+        try:
+            self.__run_streams(self.__sort(self.admission.drain()),
+                               criteria_one, criteria_two, criteria_three)
+        except DataError as e:
+            print(e)
+
+    def __sort(self, datas_batch: list) -> list[list]:
+        """Split a batch into sensor, transaction and event records"""
         sensor_list: list[tuple] = []
         trans_list: list[list[int]] = []
         event_list: list[list[str]] = []
+        for datas in datas_batch:
+            if isinstance(datas, tuple):
+                sensor_list.append(datas)
+            elif isinstance(datas, list):
+                if isinstance(datas[0], int):
+                    trans_list.append(datas)
+                elif isinstance(datas[0], str):
+                    event_list.append(datas)
+            else:
+                raise DataError("Batch's elements must be either tuple,"
+                                " list of int or list of string,"
+                                " nothing else!")
+        return [sensor_list, trans_list, event_list]
+
+    def dispatch_wire(self, payload: bytes, criteria_one: str | None,
+                      criteria_two: str | None, criteria_three: str | None)\
+            -> None:
+        """Same as dispatch_sensors for a batch in the wire format: the
+        typed buffers are sent to the streams without being turned back
+        into tuples and lists.
+
+        Args:
+            payload (bytes): A frame made by encode_batch
+            criteria_one (str | None): Filter of the sensor stream
+            criteria_two (str | None): Filter of the transaction stream
+            criteria_three (str | None): Filter of the event stream
+        """
         self.__batch += 1
         try:
-            if not isinstance(datas_batch, list):
-                raise DataError("Batchs must be a list")
-            for datas in datas_batch:
-                if isinstance(datas, tuple):
-                    sensor_list.append(datas)
-                elif isinstance(datas, list):
-                    if isinstance(datas[0], int):
-                        trans_list.append(datas)
-                    elif isinstance(datas[0], str):
-                        event_list.append(datas)
-                else:
-                    raise DataError("Batch's elements must be either tuple,"
-                                    " list of int or list of string,"
-                                    " nothing else!")
-
-            list_lists: list[list] = [sensor_list, trans_list, event_list]
-            criters_list: list[str | None] = [criteria_one, criteria_two,
-                                              criteria_three]
-            streams_lists: list[DataStream] = [self.sensor, self.trans,
-                                               self.event]
-            for arrays, streams, criter in zip(list_lists, streams_lists,
-                                               criters_list):
-                if len(arrays):
-                    print(streams.process_batch(
-                        streams.filter_data(arrays, criter)
-                        ))
-            #         ))
-            dict_sensor = self.sensor.get_stats()
-            dict_trans = self.trans.get_stats()
-            dict_event = self.event.get_stats()
-            print("\n=== Polymorphic Stream Processing ===\n")
-            print("Processing mixed stream types through unified"
-                  " interface...\n")
-            print(f"Batch {self.__batch} Results:")
-            print("\n===Sensor datas===\n")
-            print(f"{dict_sensor['total_operations']} readings processed,"
-                  f" avg temp: {dict_sensor['avg_temp']}°C, avg hum:"
-                  f" {dict_sensor['avg_hum']}, avg pressure:"
-                  f" {dict_sensor['avg_pre']}")
-            print("\n===Transactions datas===\n")
-            print(f"{dict_trans['total']} operations processed,"
-                  f" avg sell: {dict_trans['avg_sell']}$, avg buy:"
-                  f" {dict_trans['avg_buy']}$, final result:"
-                  f" {dict_trans['final_result']}$")
-            print("\n===Events datas===\n")
-            print(f"{dict_event['total']} events processed,"
-                  f" total login : {dict_event['total_login']}, total logout:"
-                  f" {dict_event['total_logout']}, total errors:"
-                  f" {dict_event['total_errors']}")
-            print("\nStream filtering active: High-priority data only")
-            height = ""
-            if criteria_one and criteria_one[0] == "<":
-                height = "large"
-            elif criteria_one and criteria_one[0] == ">":
-                height = "little"
-            print(f"Filtered results: {dict_sensor['errors']} critical"
-                  f" sensor alerts, {dict_trans['errors']} {height}"
-                  f" transaction(s) and {dict_event['errors']} event"
-                  " alert(s)")
+            batch = decode_batch(payload)
+            self.__run_streams([batch.sensors, batch.transactions,
+                                batch.events], criteria_one, criteria_two,
+                               criteria_three)
         except DataError as e:
             print(e)
 
+    def __run_streams(self, list_lists: list, criteria_one: str | None,
+                      criteria_two: str | None, criteria_three: str | None)\
+            -> None:
+        """Send each stream its part of the batch, then print the stats"""
+        criters_list: list[str | None] = [criteria_one, criteria_two,
+                                          criteria_three]
+        streams_lists: list[DataStream] = [self.sensor, self.trans,
+                                           self.event]
+        for arrays, streams, criter in zip(list_lists, streams_lists,
+                                           criters_list):
+            if len(arrays):
+                print(streams.process_batch(
+                    streams.filter_data(arrays, criter)
+                    ))
+        dict_sensor = self.sensor.get_stats()
+        dict_trans = self.trans.get_stats()
+        dict_event = self.event.get_stats()
+        print("\n=== Polymorphic Stream Processing ===\n")
+        print("Processing mixed stream types through unified"
+              " interface...\n")
+        print(f"Batch {self.__batch} Results:")
+        print("\n===Sensor datas===\n")
+        print(f"{dict_sensor['total_operations']} readings processed,"
+              f" avg temp: {dict_sensor['avg_temp']}°C, avg hum:"
+              f" {dict_sensor['avg_hum']}, avg pressure:"
+              f" {dict_sensor['avg_pre']}")
+        print("\n===Transactions datas===\n")
+        print(f"{dict_trans['total']} operations processed,"
+              f" avg sell: {dict_trans['avg_sell']}$, avg buy:"
+              f" {dict_trans['avg_buy']}$, final result:"
+              f" {dict_trans['final_result']}$")
+        print("\n===Events datas===\n")
+        print(f"{dict_event['total']} events processed,"
+              f" total login : {dict_event['total_login']}, total logout:"
+              f" {dict_event['total_logout']}, total errors:"
+              f" {dict_event['total_errors']}")
+        if self.admission is not None:
+            dict_admission = self.admission.get_stats()
+            print("\nAdmission control active: critical data first")
+            print(f"Admission: {dict_admission['admitted']} admitted,"
+                  f" {dict_admission['deferred']} deferred,"
+                  f" {dict_admission['dropped']} dropped,"
+                  f" {dict_admission['waiting']} waiting")
+        else:
+            print("\nStream filtering active")
+        height = ""
+        if criteria_one and criteria_one[0] == "<":
+            height = "large"
+        elif criteria_one and criteria_one[0] == ">":
+            height = "little"
+        print(f"Filtered results: {dict_sensor['errors']} critical"
+              f" sensor alerts, {dict_trans['errors']} {height}"
+              f" transaction(s) and {dict_event['errors']} event"
+              " alert(s)")
+
 
 def main():
     batch = [
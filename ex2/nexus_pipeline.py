@@ -11,10 +11,17 @@
 # ****************************************************************************#
 
 from abc import ABC, abstractmethod
-from typing import Any, Protocol
-import json
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable, Iterator, Protocol,\
+    TextIO
+import os
+import sys
 import time
 
+# json and mmap are imported where they are used, so that a job which
+# never meets a JSON record or a capture file doesn't pay for them
+STARTED_AT = time.perf_counter()
+
 
 class DataError(Exception):
     def __init__(self, details: str | None = None):
@@ -39,27 +46,197 @@ class ProcessingStage(Protocol):
         ...
 
 
+class StageCache:
+    """Size bounded LRU cache, with an optional time to live, used to
+    memoize the outputs of the pure stages of a pipeline.
+
+    The dicts, lists and tuples of an output are copied when it is stored
+    and on every hit, so a caller mutating its result can't change what
+    the next hits return.
+    """
+
+    def __init__(self, max_size: int, ttl: float | None = None) -> None:
+        if max_size < 1:
+            raise DataError("Cache size must be at least 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[Hashable, tuple[float, Any]] = \
+            OrderedDict()
+
+    @staticmethod
+    def make_key(stage: ProcessingStage, data: Any) -> Hashable | None:
+        """Build a hashable key from the stage and its input.
+
+        Args:
+            stage (ProcessingStage): The stage which receive the input
+            data (Any): The input of the stage
+
+        Returns:
+            Hashable | None: The key, or None if the input can't be hashed
+        """
+        def freeze(value: Any) -> Hashable:
+            if isinstance(value, memoryview):
+                return (bytes, value.tobytes())
+            if isinstance(value, dict):
+                return (dict, tuple((k, freeze(v)) for k, v in value.items()))
+            if isinstance(value, list):
+                return (list, tuple(freeze(v) for v in value))
+            if isinstance(value, tuple):
+                return (tuple, tuple(freeze(v) for v in value))
+            hash(value)
+            return (type(value), value)
+
+        try:
+            return (type(stage), freeze(data))
+        except TypeError:
+            return None
+
+    @staticmethod
+    def copy(value: Any) -> Any:
+        """Copy the containers of a stage output, down to the leaves"""
+        if isinstance(value, dict):
+            return {k: StageCache.copy(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [StageCache.copy(v) for v in value]
+        if isinstance(value, tuple):
+            return tuple(StageCache.copy(v) for v in value)
+        return value
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """Look for a key in the cache and refresh it if found.
+
+        Args:
+            key (Hashable): Key built by make_key
+
+        Returns:
+            tuple[bool, Any]: True and the cached output on a hit,
+            False and None on a miss
+        """
+        entry = self.__entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return True, StageCache.copy(value)
+            del self.__entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self.__entries[key] = (time.monotonic(), StageCache.copy(value))
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def get_stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "cache_size": len(self.__entries),
+            "cache_max_size": self.max_size,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": round(self.hits / lookups, 2) if lookups else 0
+        }
+
+
 class ProcessingPipeline(ABC):
     shared_ways = []
 
-    def __init__(self):
+    def __init__(self, cache_size: int = 0,
+                 cache_ttl: float | None = None) -> None:
         self.__stages: list[ProcessingStage] = []
+        self.__cache = StageCache(cache_size, cache_ttl) if cache_size > 0\
+            else None
 
     @abstractmethod
     def process(self, data: Any) -> Any:
         res = data
         try:
             for stage in self.__stages:
-                res = stage.process(res)
+                res = self.__run_stage(stage, res)
             return res
         except DataError as e:
             raise DataError(e)
 
+    def __run_stage(self, stage: ProcessingStage, data: Any) -> Any:
+        """Run a stage, going through the cache if the stage declares
+        itself pure (its output only depends on its input).
+        """
+        if self.__cache is None or not getattr(stage, "pure", False):
+            return stage.process(data)
+        key = StageCache.make_key(stage, data)
+        if key is None:
+            return stage.process(data)
+        found, res = self.__cache.get(key)
+        if not found:
+            res = stage.process(data)
+            self.__cache.put(key, res)
+        return res
+
+    def __stage_callable(self, stage: ProcessingStage) -> Callable:
+        if self.__cache is None or not getattr(stage, "pure", False):
+            return stage.process
+        return lambda data: self.__run_stage(stage, data)
+
     def add_stage(self, stage: ProcessingStage) -> None:
         self.__stages.append(stage)
 
+    def fuse(self) -> Callable[[Any], Any]:
+        """Compose the current stages into a single callable.
+
+        The stage methods are bound once and nested in closures of up to
+        four calls, so a pipeline of up to four stages runs a record in a
+        single frame: no loop, no attribute lookup and no re-wrapping of
+        the errors, a DataError raised by a stage comes out unchanged.
+        Longer pipelines nest the closures the same way. Stages added
+        afterwards are not included.
+
+        Returns:
+            Callable[[Any], Any]: Function running a record through all
+            the stages
+        """
+        calls = [self.__stage_callable(stage) for stage in self.__stages]
+        if not calls:
+            return lambda data: data
+        while len(calls) > 1:
+            calls = [_nest(calls[i:i + 4]) for i in range(0, len(calls), 4)]
+        return calls[0]
+
+    def stream(self, datas: Iterable[Any]) -> Iterator[Any]:
+        """Lazily run every record of an iterable through the fused stages.
+
+        Records are pulled one at a time when the consumer asks for the
+        next result, so stopping early leaves the rest untouched. An error
+        stops the generator.
+
+        Args:
+            datas (Iterable[Any]): The records to process
+
+        Yields:
+            Iterator[Any]: The output of the last stage for each record
+        """
+        run = self.fuse()
+        for data in datas:
+            yield run(data)
+
+    def get_stats(self) -> dict[str, int | float]:
+        """Get stats of the pipeline.
+
+        Returns:
+            dict[str, int | float]: Cache usage of the pipeline, empty if
+            the cache is disabled
+        """
+        return self.__cache.get_stats() if self.__cache else {}
+
     def add_ways(self, stream_id: str):
-        ProcessingPipeline.shared_ways.append(stream_id)
+        """Record that a record went through this pipeline. Each pipeline
+        appears once, so the list does not grow with the records.
+        """
+        if stream_id not in ProcessingPipeline.shared_ways:
+            ProcessingPipeline.shared_ways.append(stream_id)
 
     def test_prove(self) -> None:
         """Just a function to prove the stages are chained together
@@ -71,7 +248,24 @@ class ProcessingPipeline(ABC):
         print("\nData flow: InputStage -> TransformStage -> OutputStage")
 
 
+def _nest(calls: list[Callable]) -> Callable:
+    # One closure per group of calls: each extra frame costs as much as a
+    # small stage, so there is no closure per stage
+    if len(calls) == 1:
+        return calls[0]
+    if len(calls) == 2:
+        first, second = calls
+        return lambda data: second(first(data))
+    if len(calls) == 3:
+        first, second, third = calls
+        return lambda data: third(second(first(data)))
+    first, second, third, fourth = calls
+    return lambda data: fourth(third(second(first(data))))
+
+
 class InputStage:
+    pure = True
+
     def process(self, data: Any) -> Any:
         """Check which type of data is passed and adapts its behavior
 
@@ -80,13 +274,23 @@ class InputStage:
 
         Raises:
             JSONError: Raise an error about json format
-            DataError: Raise an error about type's file
+            DataError: Raise an error about type's file or bytes which are
+                not UTF-8
 
         Returns:
             Any: A dictionnary which contain usefull datas for the next stage
         """
+        if isinstance(data, (memoryview, bytes, bytearray)):
+            try:
+                data = str(data, "utf-8")
+            except UnicodeDecodeError as e:
+                raise DataError(f"Error detected in Stage 1: {e}")
         if isinstance(data, str):
             print(f"Input: {data}")
+            # Only a JSON object is of any use to the next stage
+            if not data.lstrip().startswith("{"):
+                return {"raw_content": data}
+            import json
             try:
                 raws = json.loads(data)
                 return raws
@@ -96,10 +300,13 @@ class InputStage:
             print(f"Input: {data}")
             return {"raw_content": data}
         else:
-            raise DataError("InputStage must receive only strings or tuples")
+            raise DataError("InputStage must receive only strings, bytes"
+                            " or tuples")
 
 
 class TransformStage:
+    pure = True
+
     def process(self, data: Any) -> Any:
         """Check which dictionnary it's and adapts behavior.
 
@@ -116,7 +323,10 @@ class TransformStage:
         if isinstance(data, dict) and data.get("sensor"):
             print("Transform: Enriched with metadata and validation")
             if data.get("sensor") == "temp":
-                temp = int(data.get("value"))
+                try:
+                    temp = int(data.get("value"))
+                except (TypeError, ValueError) as e:
+                    raise JSONError(f"Error detected in Stage 2: {e}")
                 if 20 < temp < 30:
                     return {"value": temp, "result": "Normal"}
                 else:
@@ -142,10 +352,239 @@ class TransformStage:
                             "TransformStage must receive only dictionnaries")
 
 
+class OutputSink(ABC):
+    """Deliver the results of OutputStage in batches.
+
+    write() only appends the record to a pending list. A background thread
+    hands the pending records to write_batch once batch_size of them are
+    waiting or flush_interval seconds have passed, so the transform path
+    doesn't wait on the I/O until max_pending records are waiting (10
+    batches by default). close() delivers what is left.
+
+    If setup() fails the error is kept in error, the pending records are
+    counted as failed and write() raises from then on.
+
+    Raises:
+        DataError: batch_size is below 1 or max_pending below batch_size
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_pending: int | None = None) -> None:
+        import threading
+
+        if batch_size < 1:
+            raise DataError("A sink batch holds at least one record")
+        if max_pending is not None and max_pending < batch_size:
+            raise DataError("A sink must let a whole batch wait")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending or 10 * batch_size
+        self.written = 0
+        self.failed = 0
+        self.error: Exception | None = None
+        self.__pending: list[Any] = []
+        self.__closed = False
+        self.__ready = threading.Condition()
+        self.__thread = threading.Thread(target=self.__run,
+                                         name=type(self).__name__,
+                                         daemon=True)
+        self.__thread.start()
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def write(self, record: Any) -> None:
+        """Queue a record, waiting while max_pending records are queued.
+
+        Raises:
+            DataError: The sink is closed
+            OSError: The destination could not be opened
+        """
+        with self.__ready:
+            self.__ready.wait_for(
+                lambda: self.__closed or self.error is not None or
+                len(self.__pending) < self.max_pending)
+            if self.__closed:
+                raise DataError(f"{type(self).__name__} is closed")
+            if self.error is not None:
+                self.failed += 1
+                raise OSError(f"{type(self).__name__} is unavailable: "
+                              f"{self.error}")
+            self.__pending.append(record)
+            if len(self.__pending) >= self.batch_size:
+                self.__ready.notify_all()
+
+    def close(self) -> None:
+        with self.__ready:
+            self.__closed = True
+            self.__ready.notify_all()
+        self.__thread.join()
+
+    def __run(self) -> None:
+        try:
+            try:
+                self.setup()
+            except Exception as e:
+                with self.__ready:
+                    self.error = e
+                    self.failed += len(self.__pending)
+                    self.__pending = []
+                    self.__ready.notify_all()
+                print(f"{type(self).__name__}: {e}", file=sys.stderr)
+                return
+            closed = False
+            while not closed:
+                with self.__ready:
+                    self.__ready.wait_for(
+                        lambda: self.__closed or
+                        len(self.__pending) >= self.batch_size,
+                        self.flush_interval)
+                    batch, self.__pending = self.__pending, []
+                    closed = self.__closed
+                    self.__ready.notify_all()
+                if not batch:
+                    continue
+                try:
+                    self.write_batch(batch)
+                    self.written += len(batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    print(f"{type(self).__name__}: {e}", file=sys.stderr)
+        finally:
+            self.teardown()
+
+    def setup(self) -> None:
+        """Open the destination, called from the flushing thread"""
+        pass
+
+    def teardown(self) -> None:
+        """Close the destination, called from the flushing thread"""
+        pass
+
+    @abstractmethod
+    def write_batch(self, records: list[Any]) -> None:
+        """Deliver a batch of records at once
+
+        Args:
+            records (list[Any]): The results of OutputStage, oldest first
+        """
+        pass
+
+
+class FileSink(OutputSink):
+    """Append one line per record to a text file"""
+
+    def __init__(self, path: str, batch_size: int = 500,
+                 flush_interval: float = 1.0,
+                 max_pending: int | None = None) -> None:
+        self.path = path
+        self.file: Any = None
+        super().__init__(batch_size, flush_interval, max_pending)
+
+    def setup(self) -> None:
+        self.file = open(self.path, "a", encoding="utf-8", newline="",
+                         buffering=1 << 16)
+
+    def teardown(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+    def format(self, record: Any) -> str:
+        return str(record)
+
+    def write_batch(self, records: list[Any]) -> None:
+        self.file.write("".join(self.format(record) + "\n"
+                                for record in records))
+        self.file.flush()
+
+
+class NDJSONSink(FileSink):
+    """Append one JSON document per record, tuples becoming arrays"""
+
+    def format(self, record: Any) -> str:
+        import json
+
+        return json.dumps(record, ensure_ascii=False, default=str)
+
+
+class CSVSink(FileSink):
+    """Append one CSV row per record, a tuple giving one column per value"""
+
+    def write_batch(self, records: list[Any]) -> None:
+        import csv
+
+        csv.writer(self.file).writerows(
+            list(record) if isinstance(record, (tuple, list)) else [record]
+            for record in records)
+        self.file.flush()
+
+
+class SQLiteSink(OutputSink):
+    """Insert the records in a local SQLite table, one executemany and one
+    commit per batch. The connection lives in the flushing thread.
+    """
+
+    def __init__(self, path: str, table: str = "records",
+                 batch_size: int = 500, flush_interval: float = 1.0,
+                 max_pending: int | None = None) -> None:
+        if not table.isidentifier():
+            raise DataError("SQLite table name must be an identifier")
+        self.path = path
+        self.table = table
+        self.connection: Any = None
+        super().__init__(batch_size, flush_interval, max_pending)
+
+    def setup(self) -> None:
+        import sqlite3
+
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(f"CREATE TABLE IF NOT EXISTS {self.table}"
+                                " (id INTEGER PRIMARY KEY, created REAL,"
+                                " payload TEXT)")
+
+    def teardown(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+
+    def write_batch(self, records: list[Any]) -> None:
+        import json
+
+        now = time.time()
+        rows = [(now, record if isinstance(record, str) else
+                 json.dumps(record, ensure_ascii=False, default=str))
+                for record in records]
+        with self.connection:
+            self.connection.executemany(f"INSERT INTO {self.table}"
+                                        " (created, payload) VALUES (?, ?)",
+                                        rows)
+
+
+def open_sink(path: str) -> OutputSink:
+    """Pick the sink matching the extension of path: .ndjson/.jsonl,
+    .csv, .db/.sqlite, or a plain text file otherwise.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".ndjson", ".jsonl"):
+        return NDJSONSink(path)
+    if extension == ".csv":
+        return CSVSink(path)
+    if extension in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteSink(path)
+    return FileSink(path)
+
+
 class OutputStage:
+    def __init__(self, sink: OutputSink | None = None) -> None:
+        self.sink = sink
+
     def process(self, data: Any) -> Any:
         """Format a string with the values of the dict passed
 
+        With a sink the result is handed to it instead of being printed.
+
         Args:
             data (Any): A dictionnary containing usefull datas of the process
 
@@ -153,25 +592,34 @@ class OutputStage:
             Any: A string to summarize what happened during process
         """
         if data and isinstance(data, dict) and data.get("value"):
-            print(f"Output: Processed temperature reading: {data.get('value')}"
-                  f"°C ({data.get('result')} range)")
-            return f"{data.get('value')}°C, {data.get('result')}, C)"
+            message = "Output: Processed temperature reading:"\
+                      f" {data.get('value')}°C ({data.get('result')} range)"
+            res = f"{data.get('value')}°C, {data.get('result')}, C)"
         elif data and isinstance(data, dict) and data.get("seriousness"):
-            print(f"Output: Temperature severity: {data.get('seriousness')}")
-            return (data.get("temp"), data.get("seriousness"))
+            message = f"Output: Temperature severity: "\
+                      f"{data.get('seriousness')}"
+            res = (data.get("temp"), data.get("seriousness"))
         elif data and isinstance(data, dict) and data.get("severity"):
-            return f"Output: Stream summary: {data.get('temperature')},"\
-                   f" severity: {data.get('severity')}"
+            message = None
+            res = f"Output: Stream summary: {data.get('temperature')},"\
+                  f" severity: {data.get('severity')}"
         else:
             raise DataError("OutputStage must receive a dict")
+        if self.sink is not None:
+            self.sink.write(res)
+        elif message:
+            print(message)
+        return res
 
 
 class JSONAdapter(ProcessingPipeline):
-    def __init__(self, pipeline_id: str) -> None:
-        super().__init__()
+    def __init__(self, pipeline_id: str, cache_size: int = 0,
+                 cache_ttl: float | None = None,
+                 sink: OutputSink | None = None) -> None:
+        super().__init__(cache_size, cache_ttl)
         self.add_stage(InputStage())
         self.add_stage(TransformStage())
-        self.add_stage(OutputStage())
+        self.add_stage(OutputStage(sink))
         self.__id = pipeline_id
 
     def process(self, data: Any) -> str | Any:
@@ -181,11 +629,13 @@ class JSONAdapter(ProcessingPipeline):
 
 
 class CSVAdapter(ProcessingPipeline):
-    def __init__(self, pipeline_id: str) -> None:
-        super().__init__()
+    def __init__(self, pipeline_id: str, cache_size: int = 0,
+                 cache_ttl: float | None = None,
+                 sink: OutputSink | None = None) -> None:
+        super().__init__(cache_size, cache_ttl)
         self.add_stage(InputStage())
         self.add_stage(TransformStage())
-        self.add_stage(OutputStage())
+        self.add_stage(OutputStage(sink))
         self.__id = pipeline_id
 
     def process(self, data: Any) -> str | Any:
@@ -195,11 +645,13 @@ class CSVAdapter(ProcessingPipeline):
 
 
 class StreamAdapter(ProcessingPipeline):
-    def __init__(self, pipeline_id: str) -> None:
-        super().__init__()
+    def __init__(self, pipeline_id: str, cache_size: int = 0,
+                 cache_ttl: float | None = None,
+                 sink: OutputSink | None = None) -> None:
+        super().__init__(cache_size, cache_ttl)
         self.add_stage(InputStage())
         self.add_stage(TransformStage())
-        self.add_stage(OutputStage())
+        self.add_stage(OutputStage(sink))
         self.__id = pipeline_id
 
     def process(self, data: Any) -> str | Any:
@@ -208,74 +660,1003 @@ class StreamAdapter(ProcessingPipeline):
         return super().process(data)
 
 
+class MappedFileSource:
+    """Read the newline separated records of a file without copying them.
+
+    The file is memory-mapped and each record is yielded as a read-only
+    memoryview slice of the mapping, so nothing is decoded until a stage
+    needs the text. Slices are only valid until the source is closed.
+    """
+
+    def __init__(self, path: str) -> None:
+        import mmap
+
+        self.path = path
+        self.__file = open(path, "rb")
+        self.__map: mmap.mmap | None = None
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file can't be mapped, it just has no record
+            self.__map = None
+
+    def __enter__(self) -> "MappedFileSource":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[memoryview]:
+        """Scan the mapping for newlines and yield one slice per record
+
+        Yields:
+            Iterator[memoryview]: A record without its line ending,
+            empty lines are skipped
+        """
+        if self.__map is None:
+            return
+        buffer = self.__map
+        view = memoryview(buffer)
+        size = len(buffer)
+        start = 0
+        try:
+            while start < size:
+                end = buffer.find(b"\n", start)
+                if end == -1:
+                    end = size
+                stop = end
+                if stop > start and buffer[stop - 1] == 13:
+                    stop -= 1
+                if stop > start:
+                    yield view[start:stop]
+                start = end + 1
+        finally:
+            view.release()
+
+    def close(self) -> None:
+        if self.__map is not None:
+            try:
+                self.__map.close()
+            except BufferError:
+                # A consumer still holds a slice, the mapping is released
+                # when the last one is garbage collected
+                pass
+            self.__map = None
+        self.__file.close()
+
+
+class DeadLetterQueue:
+    """Bounded on-disk queue of the records which failed, one JSON object
+    per line with the error metadata. When the file is full the oldest
+    half is discarded.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1000) -> None:
+        if max_entries < 2:
+            raise DataError("Dead-letter queue must hold at least 2 entries")
+        self.path = path
+        self.max_entries = max_entries
+        self.dropped = 0
+        self.__size = 0
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self.__size = sum(1 for _ in file)
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @staticmethod
+    def __encode(record: Any) -> Any:
+        if isinstance(record, (memoryview, bytes, bytearray)):
+            return str(record, "utf-8", errors="replace")
+        return record
+
+    def push(self, record: Any, pipeline: str, error: Exception,
+             attempts: int) -> None:
+        """Append a failed record to the queue.
+
+        Args:
+            record (Any): The record as it was received by the manager
+            pipeline (str): Name of the pipeline which failed
+            error (Exception): The error raised by the pipeline
+            attempts (int): Number of tries before giving up
+        """
+        if self.__size >= self.max_entries:
+            self.__trim()
+        entry = {
+            "time": time.time(),
+            "pipeline": pipeline,
+            "error_type": type(error).__name__,
+            "error": str(error).strip(),
+            "attempts": attempts,
+            "record": self.__encode(record)
+        }
+        import json
+
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, default=repr) + "\n")
+        self.__size += 1
+
+    def __trim(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as file:
+            lines = file.readlines()
+        keep = lines[len(lines) - self.max_entries // 2:]
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.writelines(keep)
+        self.dropped += len(lines) - len(keep)
+        self.__size = len(keep)
+
+
+class RetryPolicy:
+    """How many times a failing pipeline is tried again, with an
+    exponential backoff between the tries.
+    """
+
+    def __init__(self, max_attempts: int = 1, base_delay: float = 0.01,
+                 factor: float = 2.0, max_delay: float = 1.0) -> None:
+        if max_attempts < 1:
+            raise DataError("A record must be tried at least once")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """Get the pause before the next try.
+
+        Args:
+            attempt (int): Number of the try which just failed, from 1
+
+        Returns:
+            float: Seconds to wait
+        """
+        return min(self.base_delay * self.factor ** (attempt - 1),
+                   self.max_delay)
+
+
+class CircuitBreaker:
+    """Stop sending records to a pipeline which keeps failing.
+
+    After failure_threshold consecutive failures the circuit opens and
+    records are shed. Once reset_timeout seconds have passed one record
+    is let through (half-open): a success closes the circuit, a failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreaker.CLOSED
+        self.__failures = 0
+        self.__opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == CircuitBreaker.OPEN:
+            if time.monotonic() - self.__opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitBreaker.HALF_OPEN
+        return True
+
+    def record_success(self) -> None:
+        self.__failures = 0
+        self.state = CircuitBreaker.CLOSED
+
+    def record_failure(self) -> None:
+        self.__failures += 1
+        if self.state == CircuitBreaker.HALF_OPEN or\
+                self.__failures >= self.failure_threshold:
+            self.state = CircuitBreaker.OPEN
+            self.__opened_at = time.monotonic()
+
+
+class TokenBucket:
+    """Allow rate operations per second on average, with bursts of up to
+    capacity operations.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "__last")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        if not rate > 0:
+            raise DataError("A token bucket needs a rate above 0")
+        if not capacity >= 1:
+            raise DataError("A token bucket needs room for one token")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.__last = time.monotonic()
+
+    def take(self, amount: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.__last) * self.rate)
+        self.__last = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def wait_time(self, amount: float = 1.0) -> float:
+        """Seconds until amount tokens are available"""
+        missing = amount - self.tokens -\
+            (time.monotonic() - self.__last) * self.rate
+        return max(missing / self.rate, 0.0)
+
+
+class AdmissionControl:
+    """Rate limit the entry of records, per stream type, by priority.
+
+    Each record gets a stream type and a priority from classify (lower is
+    more urgent). Records are admitted most urgent first while the token
+    bucket of their type has tokens. The others wait in a bounded queue
+    and are tried again, before the new ones, on the next call. When the
+    queue is full the policy decides what is dropped:
+    - "drop_new": the record which doesn't fit
+    - "drop_oldest": the record waiting for the longest time
+    - "drop_lowest": the least urgent record, the newest one on a tie
+    """
+
+    CRITICAL = 0
+    NORMAL = 1
+    POLICIES = ("drop_new", "drop_oldest", "drop_lowest")
+
+    def __init__(self, classify: Callable[[Any], tuple[str, int]],
+                 rates: dict[str, tuple[float, float]],
+                 queue_size: int = 100,
+                 policy: str = "drop_lowest") -> None:
+        """
+        Args:
+            classify (Callable[[Any], tuple[str, int]]): Give the stream
+            type and the priority of a record
+            rates (dict[str, tuple[float, float]]): Records per second and
+            burst size of each stream type, a type missing is not limited
+            queue_size (int): How many records can wait
+            policy (str): What to drop when the queue is full
+
+        Raises:
+            DataError: Raise an error about the policy, a rate which is not
+            above 0 or a burst size below 1
+        """
+        if policy not in AdmissionControl.POLICIES:
+            raise DataError(f"Shedding policy must be one of"
+                            f" {', '.join(AdmissionControl.POLICIES)}")
+        self.classify = classify
+        self.buckets = {kind: TokenBucket(rate, burst)
+                        for kind, (rate, burst) in rates.items()}
+        self.queue_size = queue_size
+        self.policy = policy
+        self.admitted = 0
+        self.deferred = 0
+        self.dropped = 0
+        self.__queue: list[tuple[int, int, str, Any, bool]] = []
+        self.__sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.__queue)
+
+    def admit(self, records: list[Any]) -> list[Any]:
+        """Get the records which may be processed now.
+
+        Args:
+            records (list[Any]): The new records
+
+        Returns:
+            list[Any]: Waiting and new records allowed in, most urgent first
+        """
+        candidates = self.__queue
+        self.__queue = []
+        for record in records:
+            kind, priority = self.classify(record)
+            candidates.append((priority, self.__sequence, kind, record,
+                               False))
+            self.__sequence += 1
+        candidates.sort(key=lambda candidate: candidate[:2])
+        admitted = []
+        for candidate in candidates:
+            bucket = self.buckets.get(candidate[2])
+            if bucket is None or bucket.take():
+                admitted.append(candidate[3])
+                self.admitted += 1
+            else:
+                self.__defer(candidate)
+        return admitted
+
+    def __defer(self, candidate: tuple[int, int, str, Any, bool]) -> None:
+        if not candidate[4]:
+            self.deferred += 1
+            candidate = candidate[:4] + (True,)
+        if len(self.__queue) < self.queue_size:
+            self.__queue.append(candidate)
+            return
+        self.dropped += 1
+        if self.policy == "drop_new":
+            return
+        if self.policy == "drop_oldest":
+            victim = min(self.__queue, key=lambda waiting: waiting[1])
+        else:
+            victim = max(self.__queue, key=lambda waiting: waiting[:2])
+            if victim[:2] < candidate[:2]:
+                return
+        self.__queue.remove(victim)
+        self.__queue.append(candidate)
+
+    def wait_time(self) -> float | None:
+        """Seconds until a waiting record can be admitted, None when no
+        record is waiting.
+        """
+        if not self.__queue:
+            return None
+        return min(self.buckets[waiting[2]].wait_time()
+                   for waiting in self.__queue)
+
+    def drain(self) -> list[Any]:
+        """Wait for the tokens the waiting records need and admit them all,
+        at the rate of their stream type.
+
+        Returns:
+            list[Any]: The records which were waiting
+        """
+        admitted = self.admit([])
+        while self.__queue:
+            time.sleep(self.wait_time() or 0.0)
+            admitted += self.admit([])
+        return admitted
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "admitted": self.admitted,
+            "deferred": self.deferred,
+            "dropped": self.dropped,
+            "waiting": len(self.__queue)
+        }
+
+
+def classify_record(datas: Any) -> tuple[str, int]:
+    """Stream type and priority of a record, guessed without parsing it:
+    a record which mentions an error or a critical reading is critical.
+    """
+    if isinstance(datas, tuple):
+        text = " ".join(str(data) for data in datas)
+        kind = "stream"
+    elif isinstance(datas, (str, memoryview, bytes, bytearray)):
+        text = datas if isinstance(datas, str) else\
+            str(datas, "utf-8", errors="replace")
+        kind = "json" if text.lstrip().startswith("{") else "csv"
+    else:
+        return "other", AdmissionControl.NORMAL
+    text = text.lower()
+    critical = "error" in text or "critical" in text
+    return kind, AdmissionControl.CRITICAL if critical else\
+        AdmissionControl.NORMAL
+
+
 class NexusManager:
 
-    def __init__(self) -> None:
+    def __init__(self, cache_size: int = 0,
+                 cache_ttl: float | None = None,
+                 dead_letter: DeadLetterQueue | None = None,
+                 retry_policy: RetryPolicy | None = None,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, lazy: bool = False,
+                 sink: OutputSink | None = None,
+                 admission: AdmissionControl | None = None) -> None:
         self.pipelines: list[ProcessingPipeline] = []
         self.number_record: int = 0
         self.execution_time: float = 0
         self.number_datas: int = 0
         self.error: int = 0
+        self.shed: int = 0
         self.efficiency: int = 0
+        self.dead_letter = dead_letter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: dict[ProcessingPipeline, CircuitBreaker] = {}
+        self.first_record_at: float | None = None
+        # The last adapter delivers the final result to the sink
+        self.sink = sink
+        self.admission = admission
+        self.__factories: list[Callable[[], ProcessingPipeline]] = [
+            lambda: JSONAdapter("JSON_001", cache_size, cache_ttl),
+            lambda: CSVAdapter("CSV_001", cache_size, cache_ttl),
+            lambda: StreamAdapter("STREAM_001", cache_size, cache_ttl, sink)
+        ]
+        if not lazy:
+            self.__build_pipelines()
+
+    def __build_pipelines(self) -> None:
+        """Build the default adapters, at creation time or, in lazy mode,
+        when the first record arrives.
+        """
+        if not self.__factories:
+            return
         print("Creating Data Processing Pipeline...")
         print("Stage 1: Input validation and parsing")
         print("Stage 2: Data transformation and enrichment")
         print("Stage 3: Output formatting and delivery")
-        self.add_pipeline(JSONAdapter("JSON_001"))
-        self.add_pipeline(CSVAdapter("CSV_001"))
-        self.add_pipeline(StreamAdapter("STREAM_001"))
+        for factory in self.__factories:
+            self.add_pipeline(factory())
+        self.__factories = []
 
     def add_pipeline(self, pipeline: ProcessingPipeline) -> None:
         self.pipelines.append(pipeline)
+        self.breakers[pipeline] = CircuitBreaker(self.failure_threshold,
+                                                 self.reset_timeout)
+
+    def __run_with_retry(self, pipeline: ProcessingPipeline,
+                         data: Any) -> Any:
+        """Send data to a pipeline, trying again with backoff on failure.
 
-    def process_data(self, datas: Any) -> None:
+        A DataError comes from the record itself and would fail the same
+        way again, so it is raised at once.
+
+        Raises:
+            DataError: The record is invalid
+            Exception: The last error once all the tries have failed
+        """
+        attempt = 1
+        while True:
+            try:
+                return pipeline.process(data)
+            except DataError:
+                raise
+            except Exception:
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                time.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+
+    def process_data(self, datas: Any) -> Any:
         """Check on which adapter the datas should be send
 
+        A record which fails in a pipeline stops there: it is counted as an
+        error and sent to the dead-letter queue if there is one. Only the
+        failures of the pipeline itself (anything but a DataError, which
+        blames the record) count toward its circuit breaker; a pipeline
+        whose circuit is open sheds the record without processing it.
+
         Args:
             datas (Any): A list of differents datas to be processed
+
+        Returns:
+            Any: The output of the last pipeline, None if the record failed
         """
+        self.__build_pipelines()
         start_time = time.time()
         res = datas
+        failed = False
         self.number_record += 1
         for pipeline in self.pipelines:
+            name = type(pipeline).__name__
+            breaker = self.breakers[pipeline]
+            if not breaker.allow():
+                self.shed += 1
+                failed = True
+                print(f"Circuit open for {name}: record shed")
+                if self.dead_letter is not None:
+                    self.dead_letter.push(datas, name,
+                                          StreamError("Circuit open"), 0)
+                break
             try:
-                res = pipeline.process(res)
+                res = self.__run_with_retry(pipeline, res)
+                breaker.record_success()
             except DataError as e:
-                self.error = 1
+                failed = True
                 print(e)
-                print("Recovery initiated: Switching to backup processor")
-                print("Recovery successful: Pipeline restored,"
-                      " processing resumed")
+                if self.dead_letter is not None:
+                    self.dead_letter.push(datas, name, e, 1)
+                    print("Record sent to dead-letter queue")
+                break
+            except Exception as e:
+                breaker.record_failure()
+                failed = True
+                print(f"{name} failed: {e!r}")
+                if self.dead_letter is not None:
+                    self.dead_letter.push(datas, name, e,
+                                          self.retry_policy.max_attempts)
+                    print("Record sent to dead-letter queue")
+                break
         end_time = time.time()
-        print(res)
-        self.execution_time += round(float(end_time - start_time), 2)
+        if failed:
+            self.error += 1
+        elif self.sink is None:
+            print(res)
+        self.execution_time += end_time - start_time
         self.number_datas = self.number_record - self.error
-        self.efficiency = int((self.number_record * 100) / self.number_datas)\
-            if self.number_datas > 0 else 0
+        self.efficiency = int((self.number_datas * 100) / self.number_record)
+        if self.first_record_at is None:
+            self.first_record_at = time.perf_counter()
+        return None if failed else res
+
+    def process_file(self, path: str) -> None:
+        """Replay a capture file, one record per line, through the pipelines
+
+        Args:
+            path (str): Path of the file, which is memory-mapped
+        """
+        with MappedFileSource(path) as source:
+            for record in source:
+                self.process_data(record)
+
+    def serve(self, stream: TextIO) -> None:
+        """Warm worker mode: keep the pipelines built and process every line
+        read from the stream until it is closed.
+
+        With admission control the lines are read by a thread, so that the
+        records which wait are admitted as soon as their tokens are there,
+        even when no new line comes.
+
+        Args:
+            stream (TextIO): Where the records come from, one per line
+        """
+        if self.admission is None:
+            for line in stream:
+                record = line.rstrip("\r\n")
+                if record:
+                    self.process_data(record)
+            return
+        import queue
+        import threading
+
+        lines: queue.Queue = queue.Queue(maxsize=self.admission.queue_size)
+
+        def read() -> None:
+            try:
+                for line in stream:
+                    lines.put(line)
+            finally:
+                lines.put(None)
+
+        threading.Thread(target=read, name="NexusReader", daemon=True).start()
+        closed = False
+        while not closed:
+            try:
+                line = lines.get(timeout=self.admission.wait_time())
+            except queue.Empty:
+                self.submit([])
+                continue
+            # Whatever else was read meanwhile is admitted along with it
+            records = []
+            while True:
+                if line is None:
+                    closed = True
+                    break
+                record = line.rstrip("\r\n")
+                if record:
+                    records.append(record)
+                try:
+                    line = lines.get_nowait()
+                except queue.Empty:
+                    break
+            self.submit(records)
+        for record in self.admission.drain():
+            self.process_data(record)
+
+    def submit(self, records: list[Any]) -> list[Any]:
+        """Go through admission control before process_data: the records
+        which are not admitted wait, or are dropped, and the ones which
+        waited before are tried first.
+
+        Args:
+            records (list[Any]): New records
+
+        Returns:
+            list[Any]: Results of the records processed by this call
+        """
+        if self.admission is not None:
+            records = self.admission.admit(records)
+        return [self.process_data(record) for record in records]
+
+    def close(self) -> None:
+        """Deliver the records still pending in the sink"""
+        if self.sink is not None:
+            self.sink.close()
+
+    def get_stats(self) -> dict[str, int | float]:
+        """Get stats of the manager, with the cache usage of all pipelines.
+
+        Returns:
+            dict[str, int | float]: Return a dict which contain datas of
+            the manager in keys
+        """
+        stats: dict[str, int | float] = {
+            "records": self.number_record,
+            "errors": self.error,
+            "shed": self.shed,
+            "execution_time": round(self.execution_time, 4),
+            "efficiency": self.efficiency
+        }
+        hits = 0
+        misses = 0
+        for pipeline in self.pipelines:
+            pipeline_stats = pipeline.get_stats()
+            hits += pipeline_stats.get("cache_hits", 0)
+            misses += pipeline_stats.get("cache_misses", 0)
+        if hits + misses:
+            stats["cache_hits"] = hits
+            stats["cache_misses"] = misses
+            stats["cache_hit_rate"] = round(hits / (hits + misses), 2)
+        if self.admission is not None:
+            stats.update(self.admission.get_stats())
+        return stats
 
     def prove_chaining(self) -> None:
         """Call the same function in all adapters in a loop to prove that they
         share the same interface.
         Then do the same with the stages
         """
+        self.__build_pipelines()
         self.pipelines[0].test_prove()
         print(f"\nChain result: {self.number_record} records processed"
               " through 3-stage pipeline")
         print(f"Performance: {self.efficiency}% efficiency,"
-              f" {self.execution_time}s total processing time")
+              f" {round(self.execution_time, 4)}s total processing time")
+        if self.error:
+            print(f"Failures: {self.error} record(s) failed, {self.shed}"
+                  " shed by an open circuit")
+        if self.admission is not None:
+            dict_admission = self.admission.get_stats()
+            print(f"Admission: {dict_admission['admitted']} admitted,"
+                  f" {dict_admission['deferred']} deferred,"
+                  f" {dict_admission['dropped']} dropped,"
+                  f" {dict_admission['waiting']} waiting")
+        stats = self.get_stats()
+        if "cache_hit_rate" in stats:
+            print(f"Cache: {stats['cache_hits']} hit(s),"
+                  f" {stats['cache_misses']} miss(es),"
+                  f" {int(stats['cache_hit_rate'] * 100)}% hit rate")
+
+
+def send_frame(sock: Any, message: dict[str, Any]) -> None:
+    """Send a message as a 4 bytes big-endian length followed by JSON"""
+    import json
+
+    payload = json.dumps(message, ensure_ascii=False).encode()
+    sock.sendall(len(payload).to_bytes(4, "big") + payload)
+
+
+def recv_frame(sock: Any) -> dict[str, Any]:
+    """Read a message sent by send_frame
+
+    Raises:
+        ConnectionError: Raise an error if the peer closed the connection
+    """
+    import json
+
+    def read(size: int) -> bytes:
+        chunks = []
+        while size:
+            chunk = sock.recv(min(size, 1 << 16))
+            if not chunk:
+                raise ConnectionError("Connection closed by peer")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+    return json.loads(read(int.from_bytes(read(4), "big")))
+
+
+def _from_json(value: Any) -> Any:
+    # JSON has no tuple, and tuples are what the stream records are
+    return tuple(value) if isinstance(value, list) else value
+
+
+class NexusWorker:
+    """Worker node: run the batches sent by a coordinator through its own
+    NexusManager and answer with the results and the stats of the batch.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        import socket
+
+        self.__server = socket.create_server((host, port))
+        self.address: tuple[str, int] = self.__server.getsockname()[:2]
+        self.__nexus: NexusManager | None = None
+
+    def serve_forever(self) -> None:
+        """Serve the coordinators one connection at a time"""
+        with self.__server:
+            while True:
+                conn, _ = self.__server.accept()
+                with conn:
+                    try:
+                        while True:
+                            send_frame(conn, self.run_batch(
+                                recv_frame(conn)["records"]))
+                    except (OSError, ValueError, KeyError):
+                        continue
+
+    def run_batch(self, records: list[Any]) -> dict[str, Any]:
+        """Process a batch and measure what it added to the stats.
+
+        A record which raises is counted as an error and answered with
+        None, so a poison record never takes the worker down.
+
+        Args:
+            records (list[Any]): Records as decoded from JSON
+
+        Returns:
+            dict[str, Any]: The results, in order, and the batch stats
+        """
+        from contextlib import redirect_stdout
+
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            if self.__nexus is None:
+                self.__nexus = NexusManager()
+            nexus = self.__nexus
+            records_before = nexus.number_record
+            errors_before = nexus.error
+            time_before = nexus.execution_time
+            results = []
+            crashed = 0
+            for record in records:
+                try:
+                    results.append(nexus.process_data(_from_json(record)))
+                except Exception as e:
+                    crashed += 1
+                    results.append(None)
+                    print(f"NexusWorker: {e!r}", file=sys.stderr)
+        return {
+            "results": results,
+            "stats": {
+                "records": nexus.number_record - records_before,
+                "errors": nexus.error - errors_before + crashed,
+                "execution_time": nexus.execution_time - time_before
+            }
+        }
+
+
+def run_worker(conn: Any) -> None:
+    """Entry point of a local worker process: report the address, serve"""
+    worker = NexusWorker()
+    conn.send(worker.address)
+    conn.close()
+    worker.serve_forever()
 
 
-def main():
+def start_local_workers(count: int) -> list[tuple[Any, tuple[str, int]]]:
+    """Start worker processes listening on localhost.
+
+    Args:
+        count (int): Number of workers
+
+    Returns:
+        list[tuple[Any, tuple[str, int]]]: Each process with its address
+    """
+    import multiprocessing
+
+    workers = []
+    for _ in range(count):
+        parent, child = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=run_worker, args=(child,),
+                                          daemon=True)
+        process.start()
+        child.close()
+        workers.append((process, parent.recv()))
+        parent.close()
+    return workers
+
+
+class NexusCoordinator:
+    """Split the records in batches and ship them to worker nodes over TCP.
+
+    Each worker has a thread pulling batches from a shared queue, so a
+    faster worker takes more of them. When a worker fails, the batch it
+    was running goes back in the queue for the others. The stats sent by
+    the workers are merged into number_record, error and execution_time.
+    """
+
+    def __init__(self, addresses: list[tuple[str, int]],
+                 batch_size: int = 100, timeout: float = 30.0) -> None:
+        if not addresses:
+            raise StreamError("A coordinator needs at least one worker")
+        self.addresses = list(addresses)
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.number_record = 0
+        self.error = 0
+        self.execution_time: float = 0
+        self.reassigned = 0
+        self.lost_workers: list[tuple[str, int]] = []
+        self.__total = 0
+        self.__done = 0
+        self.__lock: Any = None
+
+    def process(self, records: list[Any]) -> list[Any]:
+        """Process records on the workers.
+
+        Args:
+            records (list[Any]): Records accepted by NexusManager. Bytes
+            which are not UTF-8 are counted as errors and not sent
+
+        Raises:
+            StreamError: Raise an error if every worker failed before the
+            end
+
+        Returns:
+            list[Any]: The result of each record, in order, None when the
+            record failed
+        """
+        import queue
+        import threading
+
+        records = list(records)
+        indexes: list[int] = []
+        sendable: list[Any] = []
+        for index, record in enumerate(records):
+            if isinstance(record, (memoryview, bytes, bytearray)):
+                try:
+                    record = str(record, "utf-8")
+                except UnicodeDecodeError:
+                    # Failed here, like InputStage fails it locally
+                    self.number_record += 1
+                    self.error += 1
+                    continue
+            indexes.append(index)
+            sendable.append(record)
+        tasks: queue.Queue = queue.Queue()
+        for start in range(0, len(sendable), self.batch_size):
+            stop = start + self.batch_size
+            tasks.put((indexes[start:stop], sendable[start:stop]))
+        self.__total = tasks.qsize()
+        self.__done = 0
+        self.__lock = threading.Lock()
+        results: list[Any] = [None] * len(records)
+        threads = [threading.Thread(target=self.__drive,
+                                    args=(address, tasks, results))
+                   for address in self.addresses]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.__done < self.__total:
+            raise StreamError(f"{self.__total - self.__done} batch(es) left"
+                              " unprocessed: no worker left")
+        return results
+
+    def __drive(self, address: tuple[str, int], tasks: Any,
+                results: list[Any]) -> None:
+        import queue
+        import socket
+
+        try:
+            sock = socket.create_connection(address, self.timeout)
+        except OSError:
+            self.__lose(address)
+            return
+        with sock:
+            while True:
+                with self.__lock:
+                    if self.__done >= self.__total:
+                        return
+                try:
+                    indexes, batch = tasks.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                try:
+                    send_frame(sock, {"records": batch})
+                    reply = recv_frame(sock)
+                    outputs = reply["results"]
+                    stats = reply["stats"]
+                except (OSError, ValueError, KeyError):
+                    tasks.put((indexes, batch))
+                    with self.__lock:
+                        self.reassigned += 1
+                    self.__lose(address)
+                    return
+                with self.__lock:
+                    for index, output in zip(indexes, outputs):
+                        results[index] = _from_json(output)
+                    self.number_record += stats["records"]
+                    self.error += stats["errors"]
+                    self.execution_time += stats["execution_time"]
+                    self.__done += 1
+
+    def __lose(self, address: tuple[str, int]) -> None:
+        with self.__lock:
+            self.lost_workers.append(address)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "records": self.number_record,
+            "errors": self.error,
+            "execution_time": round(self.execution_time, 4),
+            "workers": len(self.addresses) - len(self.lost_workers),
+            "reassigned_batches": self.reassigned
+        }
+
+
+def report_startup(nexus: NexusManager) -> None:
+    if nexus.first_record_at is not None:
+        elapsed = (nexus.first_record_at - STARTED_AT) * 1000
+        print(f"Import to first record: {elapsed:.2f} ms", file=sys.stderr)
+
+
+def main(args: list[str]):
+    """Run the demo, or serve records read from stdin.
+
+    Args:
+        args (list[str]): Capture files to replay, and the options --serve
+        (warm worker reading stdin), --lazy (build adapters on first use),
+        --measure-startup (print the import to first record time),
+        --sink=PATH (with --serve, write the results there) and
+        --workers=N (with --serve, spread stdin over N local workers) and
+        --rate=N (with --serve, admit N records/second per stream type)
+    """
+    paths = [arg for arg in args if not arg.startswith("--")]
+    workers = [arg[len("--workers="):] for arg in args
+               if arg.startswith("--workers=")]
+    if "--serve" in args and workers:
+        try:
+            count = int(workers[-1])
+            if count < 1:
+                raise StreamError("at least one worker is needed")
+        except (ValueError, DataError) as e:
+            print(f"Invalid --workers: {e}", file=sys.stderr)
+            return
+        records = [line.rstrip("\r\n") for line in sys.stdin]
+        nodes = start_local_workers(count)
+        coordinator = NexusCoordinator([address for _, address in nodes])
+        try:
+            for res in coordinator.process([record for record in records
+                                            if record]):
+                if res is not None:
+                    print(res)
+        except DataError as e:
+            print(e)
+        finally:
+            for process, _ in nodes:
+                process.terminate()
+        print(coordinator.get_stats(), file=sys.stderr)
+        return
+    if "--serve" in args:
+        sinks = [arg[len("--sink="):] for arg in args
+                 if arg.startswith("--sink=")]
+        rates = [arg[len("--rate="):] for arg in args
+                 if arg.startswith("--rate=")]
+        admission = None
+        if rates:
+            try:
+                rate = float(rates[-1])
+                admission = AdmissionControl(classify_record, {
+                    kind: (rate, max(rate, 1.0))
+                    for kind in ("json", "csv", "stream")})
+            except (ValueError, DataError) as e:
+                print(f"Invalid --rate: {e}", file=sys.stderr)
+                return
+        nexus = NexusManager(lazy="--lazy" in args,
+                             sink=open_sink(sinks[-1]) if sinks else None,
+                             admission=admission)
+        try:
+            nexus.serve(sys.stdin)
+        finally:
+            nexus.close()
+        if "--measure-startup" in args:
+            report_startup(nexus)
+        return
     print("=== CODE NEXUS - ENTERPRISE PIPELINE SYSTEM ===\n")
     print("Initializing Nexus Manager...")
     print("Pipeline capacity: 1000 streams/second\n")
-    nexus = NexusManager()
+    nexus = NexusManager(lazy="--lazy" in args)
     print("\n=== Multi-Format Data Processing ===")
     nexus.process_data('{"sensor": "temp", "value": 23.5, "unit": "C"}')
+    for path in paths:
+        print(f"\n=== Replaying {path} ===")
+        try:
+            nexus.process_file(path)
+        except OSError as e:
+            print(e)
     print("\n=== Pipeline Chaining Demo ===")
     nexus.prove_chaining()
     print("\nNexus Integration complete. All systems operational.")
+    if "--measure-startup" in args:
+        report_startup(nexus)
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
@@ -0,0 +1,132 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    test_admission.py                                  :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 18:14:20 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 18:14:22 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""Admission control, the same in ex1 and ex2: urgent records first,
+bounded waiting, and the shedding policies.
+"""
+
+from contextlib import redirect_stdout
+import io
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ex1"))
+sys.path.insert(0, os.path.join(ROOT, "ex2"))
+
+import data_stream  # noqa: E402
+import nexus_pipeline  # noqa: E402
+
+CRITICAL = ("json", 0, "critical")
+
+
+def classify(record: tuple) -> tuple[str, int]:
+    return record[0], record[1]
+
+
+def normal(name: str) -> tuple:
+    return ("json", 1, name)
+
+
+@pytest.fixture(params=[data_stream, nexus_pipeline],
+                ids=["ex1", "ex2"])
+def module(request):
+    return request.param
+
+
+def control(module, policy: str, rate: float = 0.001):
+    # One token to start with, and next to no refill unless rate is set
+    return module.AdmissionControl(classify, {"json": (rate, 1)},
+                                   queue_size=2, policy=policy)
+
+
+def refill(admission, tokens: int) -> None:
+    bucket = admission.buckets["json"]
+    bucket.capacity = bucket.tokens = tokens
+
+
+@pytest.mark.parametrize("policy, waiting", [
+    ("drop_new", ["b", "c"]),
+    ("drop_oldest", ["c", "d"]),
+    ("drop_lowest", ["b", "c"])
+])
+def test_policies(module, policy: str, waiting: list[str]) -> None:
+    admission = control(module, policy)
+    records = [normal(name) for name in "abcd"]
+    assert admission.admit(records) == [normal("a")]
+    assert admission.get_stats() == {"admitted": 1, "deferred": 3,
+                                     "dropped": 1, "waiting": 2}
+    refill(admission, 2)
+    assert [record[2] for record in admission.admit([])] == waiting
+
+
+def test_critical_record_goes_first(module) -> None:
+    admission = control(module, "drop_lowest")
+    admission.admit([normal(name) for name in "abcd"])
+    admission.admit([CRITICAL])
+    refill(admission, 2)
+    assert admission.admit([]) == [CRITICAL, normal("b")]
+
+
+def test_unlimited_kind_is_never_deferred(module) -> None:
+    admission = control(module, "drop_new")
+    records = [("csv", 1, name) for name in "abcd"]
+    assert admission.admit(records) == records
+
+
+def test_drain_admits_every_waiting_record(module) -> None:
+    admission = control(module, "drop_new", rate=200)
+    admission.admit([normal(name) for name in "abc"])
+    assert 0 < admission.wait_time() <= 0.005
+    assert [record[2] for record in admission.drain()] == ["b", "c"]
+    assert admission.wait_time() is None
+    assert len(admission) == 0
+
+
+@pytest.mark.parametrize("rate, burst", [(0, 1), (-1, 1), (float("nan"), 1),
+                                         (10, 0.5)])
+def test_bucket_limits_are_checked(module, rate: float,
+                                   burst: float) -> None:
+    with pytest.raises(module.DataError):
+        module.AdmissionControl(classify, {"json": (rate, burst)})
+
+
+def test_unknown_policy(module) -> None:
+    with pytest.raises(module.DataError):
+        module.AdmissionControl(classify, {}, policy="drop_all")
+
+
+def test_serve_admits_waiting_records_without_new_input() -> None:
+    admission = nexus_pipeline.AdmissionControl(
+        nexus_pipeline.classify_record,
+        {kind: (10, 1) for kind in ("json", "csv", "stream")})
+    with redirect_stdout(io.StringIO()):
+        nexus = nexus_pipeline.NexusManager(admission=admission)
+    reader, writer = os.pipe()
+    with os.fdopen(reader, "r") as stream, os.fdopen(writer, "w") as lines:
+        server = threading.Thread(target=nexus.serve, args=(stream,))
+        with redirect_stdout(io.StringIO()):
+            server.start()
+            lines.write('{"sensor": "temp", "value": 21}\n' * 2)
+            lines.flush()
+            deadline = time.monotonic() + 1.0
+            while nexus.number_record < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            processed = nexus.number_record
+            lines.close()
+            server.join()
+    assert processed == 2
+    assert admission.get_stats()["deferred"] == 1
@@ -0,0 +1,83 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    test_cache.py                                      :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 16:20:41 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 16:20:44 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""The stage cache of ex2 must give back what the stage computed, no
+matter what the callers did with the previous results.
+"""
+
+from contextlib import redirect_stdout
+import io
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ex2"))
+
+from nexus_pipeline import (DataError, InputStage, JSONAdapter,  # noqa: E402
+                            StageCache)
+
+RECORD = '{"sensor": "temp", "value": [1, 2]}'
+
+
+def test_hit_is_a_copy() -> None:
+    stage = InputStage()
+    with redirect_stdout(io.StringIO()):
+        output = stage.process(RECORD)
+    cache = StageCache(4)
+    key = StageCache.make_key(stage, RECORD)
+    cache.put(key, output)
+    output["sensor"] = "stored"
+    found, first = cache.get(key)
+    assert found
+    first["sensor"] = "hum"
+    first["value"].append(3)
+    assert cache.get(key) == (True, {"sensor": "temp", "value": [1, 2]})
+
+
+def test_lru_evicts_the_least_recently_used() -> None:
+    cache = StageCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get_stats()["cache_size"] == 2
+
+
+def test_ttl_expires_entries() -> None:
+    cache = StageCache(2, ttl=0)
+    cache.put("a", 1)
+    assert cache.get("a") == (False, None)
+
+
+def test_unhashable_input_is_not_cached() -> None:
+    assert StageCache.make_key(InputStage(), {"a": {1, 2}}) is None
+
+
+def test_cached_pipeline_gives_the_same_results() -> None:
+    cached = JSONAdapter("JSON_001", cache_size=8)
+    plain = JSONAdapter("JSON_001")
+    with redirect_stdout(io.StringIO()):
+        expected = [plain.process(RECORD.replace("[1, 2]", "23"))
+                    for _ in range(3)]
+        results = [cached.process(RECORD.replace("[1, 2]", "23"))
+                   for _ in range(3)]
+    assert results == expected
+    assert cached.get_stats()["cache_hits"] > 0
+
+
+def test_size_must_be_positive() -> None:
+    with pytest.raises(DataError):
+        StageCache(0)
@@ -0,0 +1,143 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    test_failures.py                                   :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 19:02:33 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 19:02:35 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""Failure handling of the NexusManager of ex2: an invalid record is
+reported once, a failing pipeline is retried and then cut off.
+"""
+
+from contextlib import redirect_stdout
+import io
+import json
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ex2"))
+
+from nexus_pipeline import (CircuitBreaker, DataError,  # noqa: E402
+                            DeadLetterQueue, NexusManager,
+                            ProcessingPipeline, RetryPolicy)
+
+GOOD = '{"sensor": "temp", "value": 23.5}'
+
+
+class Flaky(ProcessingPipeline):
+    """Fails with an error of the pipeline itself, failures times"""
+
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+        self.calls = 0
+
+    def process(self, data):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError("disk unavailable")
+        return data
+
+
+def manager(*pipelines: ProcessingPipeline, **options) -> NexusManager:
+    with redirect_stdout(io.StringIO()):
+        nexus = NexusManager(**options)
+    if pipelines:
+        nexus.pipelines.clear()
+        for pipeline in pipelines:
+            nexus.add_pipeline(pipeline)
+    return nexus
+
+
+def run(nexus: NexusManager, *records):
+    with redirect_stdout(io.StringIO()):
+        return [nexus.process_data(record) for record in records]
+
+
+def test_invalid_records_never_open_the_circuit() -> None:
+    nexus = manager(retry_policy=RetryPolicy(3, base_delay=0))
+    results = run(nexus, *["25, Normal, C"] * 6,
+                  *['{"sensor": "temp", "value": null}'] * 6, GOOD)
+    assert results[:12] == [None] * 12
+    assert results[12] is not None
+    stats = nexus.get_stats()
+    assert (stats["records"], stats["errors"], stats["shed"]) == (13, 12, 0)
+
+
+def test_invalid_record_is_not_retried() -> None:
+    class Invalid(Flaky):
+        def process(self, data):
+            self.calls += 1
+            raise DataError("bad record")
+
+    pipeline = Invalid(0)
+    nexus = manager(pipeline, retry_policy=RetryPolicy(4, base_delay=0))
+    assert run(nexus, "x") == [None]
+    assert pipeline.calls == 1
+
+
+def test_pipeline_failure_is_retried() -> None:
+    pipeline = Flaky(2)
+    nexus = manager(pipeline, retry_policy=RetryPolicy(3, base_delay=0))
+    assert run(nexus, "x") == ["x"]
+    assert pipeline.calls == 3
+    assert nexus.get_stats()["errors"] == 0
+
+
+def test_pipeline_failures_open_the_circuit() -> None:
+    nexus = manager(Flaky(100), failure_threshold=2, reset_timeout=60)
+    assert run(nexus, "a", "b", "c", "d") == [None] * 4
+    stats = nexus.get_stats()
+    assert (stats["errors"], stats["shed"]) == (4, 2)
+
+
+def test_circuit_half_opens_after_the_timeout() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_dead_letter_queue(tmp_path) -> None:
+    path = str(tmp_path / "dead.ndjson")
+    dead_letter = DeadLetterQueue(path, max_entries=4)
+    nexus = manager(dead_letter=dead_letter)
+    run(nexus, *[f"{index}, Normal" for index in range(5)], GOOD,
+        b"\xff bad")
+    with open(path, encoding="utf-8") as file:
+        entries = [json.loads(line) for line in file]
+    assert len(entries) == len(dead_letter) <= 4
+    assert dead_letter.dropped == 6 - len(entries)
+    assert entries[-1]["pipeline"] == "JSONAdapter"
+    assert entries[-1]["record"] == "� bad"
+    assert entries[-1]["attempts"] == 1
+    assert all(entry["error"] for entry in entries)
+
+
+@pytest.mark.parametrize("attempts", [0, -1])
+def test_retry_policy_needs_one_try(attempts: int) -> None:
+    with pytest.raises(DataError):
+        RetryPolicy(attempts)
+
+
+def test_retry_delay_backs_off() -> None:
+    policy = RetryPolicy(5, base_delay=0.01, factor=2, max_delay=0.03)
+    assert [policy.delay(attempt) for attempt in range(1, 5)] ==\
+        [0.01, 0.02, 0.03, 0.03]
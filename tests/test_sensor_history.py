@@ -0,0 +1,83 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    test_sensor_history.py                             :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 17:05:12 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 17:05:14 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""The history of a SensorStream keeps exactly its last readings, in
+columns which never move, so that a view on them can't break a batch.
+"""
+
+from contextlib import redirect_stdout
+import io
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ex1"))
+
+from data_stream import (SensorError, SensorHistory,  # noqa: E402
+                         SensorReadings, SensorStream)
+
+
+def readings(size: int, rng: random.Random) -> list[tuple]:
+    return [(rng.random(), rng.random(), rng.random()) for _ in range(size)]
+
+
+def as_tuples(columns: SensorReadings) -> list[tuple]:
+    return list(zip(columns.temp, columns.humidity, columns.pressure))
+
+
+@pytest.mark.parametrize("history", [1, 3, 8])
+def test_window_is_exactly_the_last_readings(history: int) -> None:
+    rng = random.Random(history)
+    stream = SensorStream("SENSOR_001", history)
+    received: list[tuple] = []
+    with redirect_stdout(io.StringIO()):
+        for size in [0, 1, 2, 5, 1, history, 3 * history, 2, 0, 4]:
+            batch = readings(size, rng)
+            received += batch
+            stream.process_batch(batch)
+            assert as_tuples(stream.window()) == received[-history:]
+
+
+def test_batch_with_a_view_alive() -> None:
+    stream = SensorStream("SENSOR_001", 3)
+    rng = random.Random(0)
+    with redirect_stdout(io.StringIO()):
+        stream.process_batch(readings(2, rng))
+        view = memoryview(stream.readings.temp)
+        stream.process_batch(readings(5, rng))
+    assert len(view) == 3
+    assert len(stream.window()) == 3
+
+
+def test_window_is_a_copy() -> None:
+    history = SensorHistory(2)
+    history.extend(SensorReadings.build([(1.0, 2.0, 3.0)]))
+    window = history.window()
+    window.append(4.0, 5.0, 6.0)
+    assert len(history) == 1
+    assert as_tuples(history.window()) == [(1.0, 2.0, 3.0)]
+
+
+def test_no_history() -> None:
+    stream = SensorStream("SENSOR_001")
+    with redirect_stdout(io.StringIO()):
+        stream.process_batch([(22.5, 78.2, 37.4)])
+    assert stream.readings is None
+    assert len(stream.window()) == 0
+
+
+def test_history_needs_room() -> None:
+    with pytest.raises(SensorError):
+        SensorHistory(0)
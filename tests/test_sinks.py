@@ -0,0 +1,103 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    test_sinks.py                                      :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 17:31:02 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 17:31:05 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""The output sinks of ex2 must deliver every record once, and account
+for the ones they could not deliver.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ex2"))
+
+from nexus_pipeline import (CSVSink, DataError, FileSink,  # noqa: E402
+                            NDJSONSink, OutputSink, SQLiteSink, open_sink)
+
+RECORDS = ["Output: a", ("22°C", "Normal"), {"value": 23}]
+
+
+def test_file_sinks_write_every_record(tmp_path) -> None:
+    paths = {kind: str(tmp_path / f"out.{kind}")
+             for kind in ("txt", "ndjson", "csv", "db")}
+    sinks = [open_sink(path) for path in paths.values()]
+    assert [type(sink) for sink in sinks] == [FileSink, NDJSONSink,
+                                              CSVSink, SQLiteSink]
+    for sink in sinks:
+        with sink:
+            for record in RECORDS:
+                sink.write(record)
+        assert (sink.written, sink.failed, sink.error) == (3, 0, None)
+    with open(paths["txt"], encoding="utf-8") as file:
+        assert file.read().splitlines()[0] == "Output: a"
+    with open(paths["ndjson"], encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] ==\
+            ["Output: a", ["22°C", "Normal"], {"value": 23}]
+    with open(paths["csv"], encoding="utf-8", newline="") as file:
+        assert list(csv.reader(file))[1] == ["22°C", "Normal"]
+    with sqlite3.connect(paths["db"]) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM records")\
+            .fetchone() == (3,)
+
+
+def test_failed_setup_is_reported(tmp_path) -> None:
+    sink = FileSink(str(tmp_path / "missing" / "out.txt"))
+    deadline = time.monotonic() + 5
+    while sink.error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(OSError):
+        sink.write("lost")
+    sink.close()
+    assert isinstance(sink.error, OSError)
+    assert (sink.written, sink.failed) == (0, 1)
+
+
+def test_write_after_close_is_refused(tmp_path) -> None:
+    sink = FileSink(str(tmp_path / "out.txt"))
+    sink.close()
+    with pytest.raises(DataError):
+        sink.write("late")
+
+
+class SlowSink(OutputSink):
+    def __init__(self, **kwargs) -> None:
+        self.largest = 0
+        self.records: list = []
+        super().__init__(**kwargs)
+
+    def write_batch(self, records: list) -> None:
+        time.sleep(0.01)
+        self.largest = max(self.largest, len(records))
+        self.records += records
+
+
+def test_pending_records_are_bounded() -> None:
+    with SlowSink(batch_size=5, flush_interval=0.01, max_pending=10) as sink:
+        for record in range(100):
+            sink.write(record)
+    assert sink.records == list(range(100))
+    assert sink.largest <= 10
+
+
+@pytest.mark.parametrize("options", [
+    {"batch_size": 0},
+    {"batch_size": 500, "max_pending": 5}
+])
+def test_sizes_are_checked(options: dict) -> None:
+    with pytest.raises(DataError):
+        SlowSink(**options)
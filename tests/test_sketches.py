@@ -0,0 +1,192 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    test_sketches.py                                   :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 18:40:07 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 18:40:09 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""The sketches of ex1 must keep their stated error bounds, and a merge
+of two sketches must answer like one sketch fed with both streams.
+"""
+
+from collections import Counter
+from contextlib import redirect_stdout
+import io
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ex1"))
+
+from data_stream import (CountMinSketch, DataError,  # noqa: E402
+                         EventSketches, EventStream, HyperLogLog,
+                         RangeCountMin, SpaceSaving, TransactionSketches,
+                         TransactionStream)
+
+
+def zipf_stream(size: int, seed: int) -> list[int]:
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, 2001)]
+    return rng.choices(range(-1000, 1000), weights, k=size)
+
+
+def test_count_min_bounds() -> None:
+    values = zipf_stream(20000, 1)
+    sketch = CountMinSketch(epsilon=0.001, delta=0.01)
+    for value in values:
+        sketch.add(value)
+    bound = 0.001 * len(values)
+    counts = Counter(values)
+    assert all(sketch.estimate(value) >= count
+               for value, count in counts.items())
+    # The bound holds for each query with probability 1 - delta, so a
+    # few items out of the 2000 may be beyond it
+    beyond = sum(sketch.estimate(value) > count + bound
+                 for value, count in counts.items())
+    assert beyond <= 0.01 * len(counts)
+
+
+def test_count_min_merge_equals_one_sketch() -> None:
+    first, second = zipf_stream(5000, 2), zipf_stream(5000, 3)
+    left, right, whole = (CountMinSketch(0.01, 0.01) for _ in range(3))
+    for value in first:
+        left.add(value)
+        whole.add(value)
+    for value in second:
+        right.add(value)
+        whole.add(value)
+    left.merge(right)
+    assert left.total == whole.total
+    assert all(left.estimate(value) == whole.estimate(value)
+               for value in set(first + second))
+    with pytest.raises(DataError):
+        left.merge(CountMinSketch(0.1, 0.01))
+
+
+def test_range_count_bounds() -> None:
+    values = [value * 997 for value in zipf_stream(10000, 4)]
+    sketch = RangeCountMin(bits=32, epsilon=0.001)
+    for value in values:
+        sketch.add(value)
+    rng = random.Random(5)
+    # At most 2 * 15 counts per level, each off by epsilon * total
+    levels = 8
+    bound = 2 * 15 * levels * 0.001 * len(values)
+    for _ in range(100):
+        low, high = sorted(rng.randint(-10 ** 6, 10 ** 6) for _ in range(2))
+        true = sum(low <= value <= high for value in values)
+        assert true <= sketch.count_range(low, high) <= true + bound
+    assert sketch.count_range(1, 0) == 0
+    assert sketch.count_range(-(1 << 31), (1 << 31) - 1) == len(values)
+
+
+def test_range_count_merge_equals_one_sketch() -> None:
+    left, right, whole = (RangeCountMin(bits=16, epsilon=0.01)
+                          for _ in range(3))
+    for value in zipf_stream(3000, 6):
+        left.add(value)
+        whole.add(value)
+    for value in zipf_stream(3000, 7):
+        right.add(value)
+        whole.add(value)
+    left.merge(right)
+    for low, high in [(-1000, 1000), (-5, 5), (0, 0), (100, 999)]:
+        assert left.count_range(low, high) == whole.count_range(low, high)
+    with pytest.raises(DataError):
+        left.merge(RangeCountMin(bits=32))
+
+
+def check_space_saving(summary: SpaceSaving, counts: Counter,
+                       total: int, counters: int) -> None:
+    top = summary.top(counters)
+    for item, count, error in top:
+        assert count - error <= counts[item] <= count
+    # An item seen more than total / counters times is always tracked
+    tracked = {item for item, _, _ in top}
+    assert all(item in tracked for item, count in counts.items()
+               if count > total / counters)
+
+
+def test_space_saving_bounds() -> None:
+    values = zipf_stream(20000, 8)
+    summary = SpaceSaving(50)
+    for value in values:
+        summary.add(value)
+    check_space_saving(summary, Counter(values), len(values), 50)
+    assert [item for item, _, _ in summary.top(3)] ==\
+        [item for item, _ in Counter(values).most_common(3)]
+
+
+def test_space_saving_merge_keeps_the_bounds() -> None:
+    first, second = zipf_stream(10000, 9), zipf_stream(10000, 10)
+    left, right = SpaceSaving(50), SpaceSaving(50)
+    for value in first:
+        left.add(value)
+    for value in second:
+        right.add(value)
+    left.merge(right)
+    check_space_saving(left, Counter(first + second), 20000, 50)
+
+
+@pytest.mark.parametrize("distinct", [10, 1000, 50000])
+def test_hyperloglog_error(distinct: int) -> None:
+    sketch = HyperLogLog(error=0.02)
+    for item in range(distinct):
+        sketch.add(f"event-{item}")
+        sketch.add(f"event-{item}")
+    assert abs(sketch.estimate() - distinct) <= 3 * 0.02 * distinct + 1
+
+
+def test_hyperloglog_merge_is_the_union() -> None:
+    left, right, whole = (HyperLogLog(0.02) for _ in range(3))
+    for item in range(0, 6000):
+        left.add(item)
+        whole.add(item)
+    for item in range(4000, 10000):
+        right.add(item)
+        whole.add(item)
+    left.merge(right)
+    assert left.estimate() == whole.estimate()
+    with pytest.raises(DataError):
+        left.merge(HyperLogLog(0.2))
+
+
+def test_transaction_stats() -> None:
+    stream = TransactionStream("TRANS_001", TransactionSketches(top_k=3))
+    amounts = [150, -200, 150, -900, 150, 75, -200, -1500]
+    with redirect_stdout(io.StringIO()):
+        stream.process_batch(amounts)
+    stats = stream.get_stats(buys_above=500)
+    assert stats["top_amounts"][:2] == [(150, 3, 0), (-200, 2, 0)]
+    assert stats["buys_above"] == 2
+    assert stats["sketch_bytes"] > 0
+
+
+def test_event_stats() -> None:
+    stream = EventStream("EVENT_001", EventSketches(top_k=2))
+    with redirect_stdout(io.StringIO()):
+        stream.process_batch(["login", "error", "login", "logout", "login"])
+    stats = stream.get_stats()
+    assert stats["distinct_kinds"] == {"EVENT_001": 3}
+    assert stats["top_events"] == [("login", 3, 0), ("error", 1, 0)] or\
+        stats["top_events"] == [("login", 3, 0), ("logout", 1, 0)]
+
+
+def test_sketches_merge() -> None:
+    left, right = TransactionSketches(top_k=2), TransactionSketches(top_k=2)
+    for amount in [10, 10, -600]:
+        left.update(amount)
+    for amount in [10, -700, -700]:
+        right.update(amount)
+    left.merge(right)
+    stats = left.get_stats(buys_above=500)
+    assert stats["top_amounts"] == [(10, 3, 0), (-700, 2, 0)]
+    assert stats["buys_above"] == 3
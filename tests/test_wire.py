@@ -0,0 +1,90 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    test_wire.py                                       :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 14:02:10 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 14:02:12 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""The wire format of ex1 must give the same results as the lists and
+tuples it replaces, and refuse any frame it did not make.
+"""
+
+from contextlib import redirect_stdout
+import io
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ex1"))
+
+from data_stream import (StreamProcessor, WireError,  # noqa: E402
+                         decode_batch, encode_batch)
+
+BATCH = [
+    (22.5, 78.2, 37.4),
+    [15, 150, 890],
+    ["login", "logout", "login"],
+    [69, 450, 935, -502],
+    [752, 532, -2420, 632],
+    ["error", "logout", "login", "error"],
+    (25.7, 67.3, 43.2),
+    ["logout", "logout", "login", "error", "login"],
+    (32.1, 70.1, 39.6)
+]
+CRITERIA = [
+    ("<30", "<900", "error"),
+    (None, None, None),
+    (">25", ">100", "login"),
+    ("x", "y", "z")
+]
+
+
+def run(dispatch: str, batch: list | bytes,
+        criteria: tuple) -> tuple[str, list]:
+    processor = StreamProcessor()
+    output = io.StringIO()
+    with redirect_stdout(output):
+        getattr(processor, dispatch)(batch, *criteria)
+    stats = [processor.sensor.get_stats(), processor.trans.get_stats(),
+             processor.event.get_stats()]
+    return output.getvalue(), stats
+
+
+@pytest.mark.parametrize("criteria", CRITERIA)
+def test_round_trip_matches_the_lists(criteria: tuple) -> None:
+    expected = run("dispatch_sensors", BATCH, criteria)
+    assert run("dispatch_wire", encode_batch(BATCH), criteria) == expected
+
+
+def test_decode_keeps_every_record() -> None:
+    batch = decode_batch(encode_batch(BATCH))
+    readings = [datas for datas in BATCH if isinstance(datas, tuple)]
+    amounts = [datas for datas in BATCH
+               if isinstance(datas, list) and isinstance(datas[0], int)]
+    events = [datas for datas in BATCH
+              if isinstance(datas, list) and isinstance(datas[0], str)]
+    assert list(batch.sensors) == [value for reading in readings
+                                   for value in reading]
+    assert list(batch.transactions) == [amount for group in amounts
+                                        for amount in group]
+    assert len(batch.events) == sum(len(group) for group in events)
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda payload: b"XXXX" + payload[4:],
+    lambda payload: payload[:4] + b"\x02" + payload[5:],
+    lambda payload: payload[:-1],
+    lambda payload: payload[:len(payload) // 2],
+    lambda payload: payload + b"\x00"
+], ids=["bad magic", "wrong version", "truncated end", "truncated half",
+        "trailing bytes"])
+def test_corrupted_frame_is_refused(corrupt) -> None:
+    with pytest.raises(WireError):
+        decode_batch(corrupt(encode_batch(BATCH)))
@@ -0,0 +1,78 @@
+# ****************************************************************************#
+#                                                                             #
+#                                                         :::      ::::::::   #
+#    test_workers.py                                    :+:      :+:    :+:   #
+#                                                     +:+ +:+         +:+     #
+#    By: bfitte <bfitte@student.42lyon.fr>          +#+  +:+       +#+        #
+#                                                 +#+#+#+#+#+   +#+           #
+#    Created: 2026/10/19 17:52:40 by bfitte            #+#    #+#             #
+#    Updated: 2026/10/19 17:52:43 by bfitte           ###   ########lyon.fr   #
+#                                                                             #
+# ****************************************************************************#
+
+"""The coordinator and the workers of ex2 must answer for every record,
+whatever the records contain.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "ex2"))
+
+from nexus_pipeline import (NexusCoordinator, NexusManager,  # noqa: E402
+                            NexusWorker, StreamError)
+
+GOOD = '{"sensor": "temp", "value": 23}'
+POISON = '{"sensor": "temp", "value": null}'
+
+
+@pytest.fixture
+def workers() -> list[tuple[str, int]]:
+    addresses = []
+    for _ in range(2):
+        worker = NexusWorker()
+        threading.Thread(target=worker.serve_forever, daemon=True).start()
+        addresses.append(worker.address)
+    return addresses
+
+
+def test_poison_records_are_answered(workers) -> None:
+    coordinator = NexusCoordinator(workers, batch_size=4)
+    results = coordinator.process([GOOD] * 10 + [POISON] * 10)
+    assert all(res is not None for res in results[:10])
+    assert results[10:] == [None] * 10
+    stats = coordinator.get_stats()
+    assert (stats["records"], stats["errors"]) == (20, 10)
+    assert stats["workers"] == 2
+
+
+def test_bytes_which_are_not_utf8_fail_alone(workers) -> None:
+    coordinator = NexusCoordinator(workers, batch_size=2)
+    results = coordinator.process([GOOD.encode(), b"\xff\xfe", GOOD])
+    assert results[0] is not None and results[2] is not None
+    assert results[1] is None
+    assert coordinator.get_stats()["errors"] == 1
+
+
+def test_worker_survives_a_crashing_record(monkeypatch) -> None:
+    process_data = NexusManager.process_data
+
+    def crash_on_boom(self, datas):
+        if datas == "boom":
+            raise TypeError("boom")
+        return process_data(self, datas)
+
+    monkeypatch.setattr(NexusManager, "process_data", crash_on_boom)
+    reply = NexusWorker().run_batch(["boom", GOOD])
+    assert reply["results"][0] is None
+    assert reply["results"][1] is not None
+    assert reply["stats"]["errors"] == 1
+
+
+def test_coordinator_needs_a_worker() -> None:
+    with pytest.raises(StreamError):
+        NexusCoordinator([])